@@ -0,0 +1,75 @@
+"""
+Compare CSV ingestion paths on a synthetically enlarged copy of file.csv:
+
+    full      pd.read_csv with all 18 columns and default type inference (old load_data)
+    pruned    read_csv_typed: 3 columns, explicit float32 dtypes
+    snapshot  load_frame on the cached Parquet snapshot (later DAG runs)
+
+Each path runs in its own subprocess so peak RSS is measured in isolation.
+
+Usage (from airflow_lab/):
+    python benchmarks/bench_ingest.py --factor 50
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_streaming import DAGS_DIR, enlarge_csv
+
+
+def child(args):
+    import pandas as pd
+    from src.artifacts import load_frame
+    from src.ingest import read_csv_typed, snapshot_csv
+
+    ref = snapshot_csv(args.csv) if args.mode == "snapshot" else None
+    start = time.perf_counter()
+    if args.mode == "full":
+        df = pd.read_csv(args.csv)
+    elif args.mode == "pruned":
+        df = read_csv_typed(args.csv)
+    else:
+        df = load_frame(ref)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    print(json.dumps({"mode": args.mode, "seconds": elapsed, "peak_rss_mb": peak_mb,
+                      "frame_mb": df.memory_usage(deep=True).sum() / 2**20, "shape": list(df.shape)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--factor", type=int, default=20, help="Copies of file.csv to concatenate")
+    parser.add_argument("--mode", choices=["full", "pruned", "snapshot"], help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "file_large.csv")
+        rows = enlarge_csv(os.path.join(DAGS_DIR, "data", "file.csv"), csv_path, args.factor)
+        print(f"Synthetic input: {rows:,} rows, {os.path.getsize(csv_path) / 2**20:.1f} MiB")
+
+        env = dict(os.environ, LAB_ARTIFACT_DIR=os.path.join(tmp, "artifacts"))
+        # Build the snapshot once, outside the timed runs (first DAG run pays this)
+        subprocess.run([sys.executable, "-c", "import sys; from src.ingest import snapshot_csv; "
+                        "print(snapshot_csv(sys.argv[1])['seconds'])", csv_path],
+                       env=dict(env, PYTHONPATH=DAGS_DIR), check=True, capture_output=True)
+        for mode in ("full", "pruned", "snapshot"):
+            out = subprocess.run([sys.executable, __file__, "--mode", mode, "--csv", csv_path],
+                                 env=env, capture_output=True, text=True, check=True)
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{mode:>8}: {result['seconds'] * 1000:8.1f} ms   frame {result['frame_mb']:7.1f} MiB   "
+                  f"peak RSS {result['peak_rss_mb']:7.1f} MiB   shape {result['shape']}")
+
+
+if __name__ == "__main__":
+    main()
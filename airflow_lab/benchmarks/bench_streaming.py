@@ -0,0 +1,102 @@
+"""
+Compare the in-memory clustering path with the out-of-core streaming path
+on a synthetically enlarged copy of file.csv.
+
+Each path runs in its own subprocess so peak RSS is measured in isolation.
+
+Usage (from airflow_lab/):
+    python benchmarks/bench_streaming.py --factor 50 --k-max 10
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DAGS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "dags"))
+sys.path.insert(0, DAGS_DIR)
+
+
+def enlarge_csv(src, dst, factor, seed=0):
+    """
+    Writes `factor` jittered copies of `src` to `dst`, one copy at a time.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.read_csv(src)
+    numeric = df.select_dtypes("number").columns
+    rng = np.random.default_rng(seed)
+    for i in range(factor):
+        copy = df.copy()
+        copy[numeric] = copy[numeric] * rng.normal(1.0, 0.01, size=(len(df), len(numeric)))
+        copy.to_csv(dst, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return len(df) * factor
+
+
+def run_in_memory(csv_path, k_max):
+    import pandas as pd
+    from sklearn.preprocessing import MinMaxScaler
+    from src.artifacts import save_array
+    from src.lab import CLUSTER_COLUMNS, build_save_model
+
+    df = pd.read_csv(csv_path).dropna()
+    scaled = MinMaxScaler().fit_transform(df[CLUSTER_COLUMNS])
+    ref = save_array(scaled, "bench")
+    return build_save_model(ref, "bench_in_memory.sav", k_max=k_max, n_jobs=1)
+
+
+def run_streaming(csv_path, k_max, chunksize):
+    from src.streaming import build_save_model_streaming
+
+    return build_save_model_streaming("bench_streaming.sav", k_max=k_max,
+                                      csv_path=csv_path, chunksize=chunksize)
+
+
+def child(args):
+    start = time.perf_counter()
+    if args.mode == "in_memory":
+        sweep = run_in_memory(args.csv, args.k_max)
+    else:
+        sweep = run_streaming(args.csv, args.k_max, args.chunksize)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    print(json.dumps({"mode": args.mode, "seconds": elapsed, "peak_rss_mb": peak_mb,
+                      "sse_k1": sweep["sse"][0], "sse_kmax": sweep["sse"][-1]}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--factor", type=int, default=20, help="Copies of file.csv to concatenate")
+    parser.add_argument("--k-max", type=int, default=10)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--mode", choices=["in_memory", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "file_large.csv")
+        rows = enlarge_csv(os.path.join(DAGS_DIR, "data", "file.csv"), csv_path, args.factor)
+        print(f"Synthetic input: {rows:,} rows, {os.path.getsize(csv_path) / 2**20:.1f} MiB")
+
+        env = dict(os.environ, LAB_ARTIFACT_DIR=os.path.join(tmp, "artifacts"))
+        for mode in ("in_memory", "streaming"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--csv", csv_path,
+                 "--k-max", str(args.k_max), "--chunksize", str(args.chunksize)],
+                env=env, capture_output=True, text=True, check=True)
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{mode:>10}: {result['seconds']:8.1f} s   peak RSS {result['peak_rss_mb']:8.1f} MiB   "
+                  f"SSE(k=1) {result['sse_k1']:.1f}   SSE(k={args.k_max}) {result['sse_kmax']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
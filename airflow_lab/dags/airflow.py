@@ -5,11 +5,40 @@ from airflow.operators.python import PythonOperator # type: ignore
 from datetime import datetime, timedelta
 from airflow.utils.email import send_email # type: ignore
 from src.lab import load_data, data_preprocessing, build_save_model, load_model_elbow, generate_dashboard
+from src.streaming import build_save_model_streaming
+from src.artifacts import purge_runs
 import os
+
+# k range swept by build_save_model (inclusive), number of worker processes (-1 = all CPUs)
+# and search mode ('full' fits every k, 'adaptive' only what is needed to find the elbow)
+KMEANS_SWEEP = {
+    'k_min': int(os.environ.get('KMEANS_K_MIN', 1)),
+    'k_max': int(os.environ.get('KMEANS_K_MAX', 49)),
+    'n_jobs': int(os.environ.get('KMEANS_N_JOBS', -1)),
+    'search': os.environ.get('KMEANS_SEARCH', 'full'),
+}
+
+# Rows dropped before clustering: 'row' drops any row of file.csv with a missing
+# value (the original behaviour), 'cluster' only rows missing a clustering column
+PREPROCESS = {
+    'dropna': os.environ.get('PREPROCESS_DROPNA', 'row'),
+}
+
+# Silhouette scoring for the dashboard: 'exact' scores every row (O(n^2)),
+# 'sample' a stratified sample with a 95% confidence interval, 'auto' samples
+# only above SILHOUETTE_SAMPLE_SIZE rows
+SILHOUETTE = {
+    'silhouette': os.environ.get('SILHOUETTE_MODE', 'auto'),
+    'sample_size': int(os.environ.get('SILHOUETTE_SAMPLE_SIZE', 10_000)),
+    'seed': int(os.environ.get('SILHOUETTE_SEED', 42)),
+}
+
 # NOTE:
-# In Airflow 3.x, enabling XCom pickling should be done via environment variable:
-# export AIRFLOW__CORE__ENABLE_XCOM_PICKLING=True
-# The old airflow.configuration API is deprecated.
+# Tasks exchange data through the run-scoped artifact store (src/artifacts.py):
+# files live under dags/artifacts/<run_id>/ and only small JSON references go
+# through XCom, so XCom pickling is not needed. Run directories older than
+# LAB_ARTIFACT_RETENTION_DAYS (0 = keep forever) are deleted at the end of each run.
+ARTIFACT_RETENTION_DAYS = float(os.environ.get('LAB_ARTIFACT_RETENTION_DAYS', 7))
 
 def notify_success(context):
     dag_id = context['dag'].dag_id
@@ -70,6 +99,7 @@ with DAG(
         task_id='data_preprocessing_task',
         python_callable=data_preprocessing,
         op_args=[load_data_task.output],
+        op_kwargs=PREPROCESS,
     )
 
     # Task to build and save a model, depends on 'data_preprocessing_task'
@@ -77,6 +107,7 @@ with DAG(
         task_id='build_save_model_task',
         python_callable=build_save_model,
         op_args=[data_preprocessing_task.output, "model.sav"],
+        op_kwargs=KMEANS_SWEEP,
     )
 
     # Task to load a model using the 'load_model_elbow' function, depends on 'build_save_model_task'
@@ -91,15 +122,53 @@ with DAG(
     generate_dashboard_task = PythonOperator(
         task_id='generate_dashboard_task',
         python_callable=generate_dashboard,
+        # optimal_k is not passed: load_model_task returns a test.csv prediction,
+        # so the dashboard uses the sweep's elbow and its stored centroids
         op_args=[
             data_preprocessing_task.output,
             build_save_model_task.output,
-            load_model_task.output,
         ],
+        op_kwargs=SILHOUETTE,
+    )
+
+    # Task to delete expired run directories; runs even if an upstream task failed
+    cleanup_artifacts_task = PythonOperator(
+        task_id='cleanup_artifacts_task',
+        python_callable=purge_runs,
+        op_args=[ARTIFACT_RETENTION_DAYS],
+        trigger_rule='all_done',
     )
 
     # Set task dependencies
-    load_data_task >> data_preprocessing_task >> build_save_model_task >> load_model_task >> generate_dashboard_task
+    load_data_task >> data_preprocessing_task >> build_save_model_task >> load_model_task >> generate_dashboard_task >> cleanup_artifacts_task
+
+# Out-of-core variant: reads file.csv in chunks and trains MiniBatchKMeans with
+# partial_fit, so worker memory stays bounded however large the input grows
+with DAG(
+    'Airflow_Lab1_Streaming',
+    default_args=default_args,
+    description='Out-of-core (chunked CSV + MiniBatchKMeans) variant of Airflow_Lab1',
+    catchup=False,
+    on_success_callback=notify_success,
+) as streaming_dag:
+    streaming_build_task = PythonOperator(
+        task_id='build_save_model_streaming_task',
+        python_callable=build_save_model_streaming,
+        op_args=["model_streaming.sav"],
+        op_kwargs={
+            'k_min': KMEANS_SWEEP['k_min'],
+            'k_max': KMEANS_SWEEP['k_max'],
+            'chunksize': int(os.environ.get('STREAMING_CHUNKSIZE', 100_000)),
+        },
+    )
+
+    streaming_elbow_task = PythonOperator(
+        task_id='load_model_task',
+        python_callable=load_model_elbow,
+        op_args=["model_streaming.sav", streaming_build_task.output],
+    )
+
+    streaming_build_task >> streaming_elbow_task
 
 # If this script is run directly, allow command-line interaction with the DAG
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+import pandas as pd # type: ignore
+
+# Root of the run-scoped artifact directories (shared by all tasks via the dags mount)
+ARTIFACT_ROOT = os.environ.get(
+    "LAB_ARTIFACT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "artifacts"),
+)
+
+# Store-wide subdirectories shared by all runs (Parquet snapshots, step cache);
+# everything else directly under ARTIFACT_ROOT is a run directory
+SHARED_DIRS = {"snapshots", "cache"}
+
+
+def _safe_run_id(run_id):
+    # Airflow run ids look like "manual__2026-01-15T00:00:00+00:00"
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", run_id or "local")
+
+
+def _run_dir(run_id):
+    safe = _safe_run_id(run_id)
+    path = os.path.join(ARTIFACT_ROOT, safe)
+    os.makedirs(path, exist_ok=True)
+    return safe, path
+
+
+def _publish(tmp_path, run_id, digest, suffix):
+    # Content-addressed: identical payloads within a run share one file
+    safe, path = _run_dir(run_id)
+    name = f"{digest[:16]}{suffix}"
+    final_path = os.path.join(path, name)
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, final_path)
+    return f"{safe}/{name}"
+
+
+def artifact_path(ref):
+    """
+    Absolute path of the file behind an artifact reference.
+    """
+    return os.path.join(ARTIFACT_ROOT, ref["path"])
+
+
+def adopt_file(src_path, ref, run_id=None):
+    """
+    Places an existing artifact file (e.g. from the step cache) into this run's
+    directory, hard-linked where possible, and returns the updated reference.
+    """
+    safe, path = _run_dir(run_id)
+    name = os.path.basename(ref["path"])
+    final_path = os.path.join(path, name)
+    if not os.path.exists(final_path):
+        tmp_path = os.path.join(path, f".{name}.{os.getpid()}.tmp")
+        try:
+            os.link(src_path, tmp_path)
+        except OSError:
+            shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, final_path)
+    return dict(ref, path=f"{safe}/{name}")
+
+
+def save_array(array, run_id=None):
+    """
+    Stores a NumPy array as a .npy file and returns a small JSON-safe reference for XCom.
+    Args:
+        array (numpy.ndarray): Array to store.
+        run_id (str): Airflow run id; artifacts of one run share a directory.
+    Returns:
+        dict: {"kind", "path", "sha256", "shape", "dtype"}
+    """
+    array = np.ascontiguousarray(array)
+    digest = hashlib.sha256()
+    digest.update(f"{array.dtype.str}{array.shape}".encode())
+    digest.update(memoryview(array).cast("B"))
+    sha = digest.hexdigest()
+
+    _, path = _run_dir(run_id)
+    tmp_path = os.path.join(path, f".{sha}.{os.getpid()}.tmp.npy")
+    np.save(tmp_path, array, allow_pickle=False)
+    return {
+        "kind": "npy",
+        "path": _publish(tmp_path, run_id, sha, ".npy"),
+        "sha256": sha,
+        "shape": list(array.shape),
+        "dtype": array.dtype.str,
+    }
+
+
+def load_array(ref, mmap=True):
+    """
+    Loads an array saved by save_array. By default the file is memory-mapped
+    read-only, so no copy is made until the data is actually touched.
+    """
+    return np.load(artifact_path(ref), mmap_mode="r" if mmap else None, allow_pickle=False)
+
+
+def save_frame(df, run_id=None):
+    """
+    Stores a DataFrame as Parquet and returns a small JSON-safe reference for XCom.
+    """
+    _, path = _run_dir(run_id)
+    tmp_path = os.path.join(path, f".{os.getpid()}.{id(df)}.tmp.parquet")
+    df.to_parquet(tmp_path, index=False)
+
+    digest = hashlib.sha256()
+    with open(tmp_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    sha = digest.hexdigest()
+    return {
+        "kind": "parquet",
+        "path": _publish(tmp_path, run_id, sha, ".parquet"),
+        "sha256": sha,
+        "shape": list(df.shape),
+        "columns": list(df.columns),
+    }
+
+
+def load_frame(ref, columns=None):
+    """
+    Loads a DataFrame saved by save_frame (Arrow reads the file memory-mapped).
+    """
+    return pd.read_parquet(artifact_path(ref), columns=columns, memory_map=True)
+
+
+def purge_runs(max_age_days: float, run_id=None):
+    """
+    Retention policy for the store: deletes run directories that have not
+    been written to for `max_age_days` days. Shared directories and the
+    current run are always kept.
+    Args:
+        max_age_days (float): Age limit in days; 0 or less keeps everything.
+        run_id (str): Airflow run id of the calling run.
+    Returns:
+        list: Names of the deleted run directories.
+    """
+    if max_age_days <= 0 or not os.path.isdir(ARTIFACT_ROOT):
+        return []
+    current = _safe_run_id(run_id)
+    cutoff = time.time() - max_age_days * 86400
+    removed = []
+    for entry in os.scandir(ARTIFACT_ROOT):
+        if not entry.is_dir(follow_symlinks=False) or entry.name in SHARED_DIRS or entry.name == current:
+            continue
+        if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+            # Files hard-linked from the step cache keep their cached copy
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed.append(entry.name)
+    print(f"purge_runs: removed {len(removed)} run directories older than {max_age_days:g} days")
+    return removed
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd # type: ignore
+
+from src.artifacts import ARTIFACT_ROOT
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "file.csv")
+
+# The only columns the pipeline uses
+CLUSTER_COLUMNS = ["BALANCE", "PURCHASES", "CREDIT_LIMIT"]
+
+# Amounts are below 1e5 with at most 6 decimals; float32 keeps ~7 significant
+# digits, i.e. an absolute error < 0.004, which is ~1e-7 of each column's range
+# after MinMax scaling and does not change the clustering.
+CSV_DTYPES = {"BALANCE": "float32", "PURCHASES": "float32", "CREDIT_LIMIT": "float32"}
+
+# Boolean snapshot column: True when the source row has no missing value in
+# any of its columns, i.e. the rows a full-frame dropna() keeps
+COMPLETE_COLUMN = "_row_complete"
+
+# Parquet snapshots live inside the artifact store so load_frame can read them
+SNAPSHOT_SUBDIR = "snapshots"
+
+
+def file_sha256(path: str):
+    """
+    Streams a file through SHA-256 (1 MiB at a time).
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_csv_typed(csv_path: str = DATA_PATH, columns: list = CLUSTER_COLUMNS, dtypes: dict = CSV_DTYPES,
+                   complete_column: str = None):
+    """
+    Parses only `columns` from the CSV with explicit dtypes (no type inference,
+    the string CUST_ID column is never materialised).
+
+    With `complete_column`, every column is parsed once more to add a boolean
+    column of that name marking rows without any missing value, so callers
+    can still drop rows the way a full-frame dropna() would.
+    """
+    if complete_column is None:
+        df = pd.read_csv(csv_path, usecols=columns, dtype=dtypes, engine="c")
+        # usecols keeps the file's column order; return the requested one
+        return df[columns]
+    full = pd.read_csv(csv_path, dtype=dtypes, engine="c")
+    df = full[columns].copy()
+    df[complete_column] = full.notna().all(axis=1).to_numpy()
+    return df
+
+
+def _schema_digest(columns, dtypes, complete_column=None):
+    fields = [[c, str(dtypes.get(c, ""))] for c in columns]
+    if complete_column:
+        fields.append([complete_column, "bool"])
+    schema = json.dumps(fields)
+    return hashlib.sha256(schema.encode()).hexdigest()[:8]
+
+
+def snapshot_csv(csv_path: str = DATA_PATH, columns: list = CLUSTER_COLUMNS, dtypes: dict = CSV_DTYPES,
+                 complete_column: str = COMPLETE_COLUMN):
+    """
+    Returns a Parquet snapshot of the pruned, typed CSV, parsing the CSV only
+    when the source has changed. The snapshot also holds `complete_column`
+    (see read_csv_typed) unless it is None.
+
+    The snapshot is named after the source's SHA-256 and the column/dtype
+    schema. A small manifest remembers the source's mtime and size, so an
+    untouched file is not even re-hashed; a file that was touched but not
+    modified is re-hashed and its existing snapshot reused.
+    Returns:
+        dict: Artifact reference readable by load_frame, plus "source_sha256",
+        "cache_hit" and "seconds" (time spent producing the frame).
+    """
+    start = time.perf_counter()
+    snapshot_dir = os.path.join(ARTIFACT_ROOT, SNAPSHOT_SUBDIR)
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    stored = list(columns) + ([complete_column] if complete_column else [])
+    schema = _schema_digest(columns, dtypes, complete_column)
+    manifest_path = os.path.join(snapshot_dir, f"{stem}-{schema}.json")
+    stat = os.stat(csv_path)
+
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    unchanged = manifest.get("mtime_ns") == stat.st_mtime_ns and manifest.get("size") == stat.st_size
+    sha = manifest["source_sha256"] if unchanged else file_sha256(csv_path)
+    name = f"{stem}-{sha[:16]}-{schema}.parquet"
+    path = os.path.join(snapshot_dir, name)
+
+    cache_hit = os.path.exists(path)
+    if cache_hit:
+        shape = manifest.get("shape") if manifest.get("source_sha256") == sha else None
+        if shape is None:
+            shape = [pd.read_parquet(path, columns=columns[:1]).shape[0], len(stored)]
+    else:
+        df = read_csv_typed(csv_path, columns, dtypes, complete_column)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        shape = list(df.shape)
+
+    manifest = {"source": os.path.abspath(csv_path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                "source_sha256": sha, "snapshot": name, "shape": shape}
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+    return {
+        "kind": "parquet",
+        "path": f"{SNAPSHOT_SUBDIR}/{name}",
+        "source_sha256": sha,
+        "shape": shape,
+        "columns": stored,
+        "cache_hit": cache_hit,
+        "seconds": time.perf_counter() - start,
+    }
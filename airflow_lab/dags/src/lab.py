@@ -1,72 +1,229 @@
+import numpy as np
 import pandas as pd # type: ignore
 from sklearn.preprocessing import MinMaxScaler # type: ignore
 from sklearn.cluster import KMeans # type: ignore
 from kneed import KneeLocator # type: ignore
+from joblib import Parallel, delayed # type: ignore
 import pickle
 import os
-import base64
-import json
 from datetime import datetime
-from sklearn.metrics import silhouette_score # type: ignore
+from sklearn.metrics import pairwise_distances_argmin # type: ignore
+from src.artifacts import load_frame, save_array, load_array
+from src.ingest import CLUSTER_COLUMNS, COMPLETE_COLUMN, DATA_PATH, snapshot_csv
+from src.scoring import silhouette_estimate
+from src.stepcache import cached_step
 
-def load_data():
+
+KMEANS_KWARGS = {"init": "random", "n_init": 10, "max_iter": 300, "random_state": 42}
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "model")
+
+def load_data(run_id=None):
     """
-    Loads data from a CSV file, serializes it, and returns the serialized data.
+    Loads the clustering columns of the CSV file as float32 through a cached
+    Parquet snapshot; the CSV is only parsed again when it has changed.
     Returns:
-        str: Base64-encoded serialized data (JSON-safe).
+        dict: Small artifact reference (JSON-safe) to pass through XCom.
     """
     print("We are here")
-    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "../data/file.csv"))
-    serialized_data = pickle.dumps(df)                    # bytes
-    return base64.b64encode(serialized_data).decode("ascii")  # JSON-safe string
+    ref = snapshot_csv(DATA_PATH)
+    source = "reused Parquet snapshot" if ref["cache_hit"] else "parsed CSV"
+    print(f"load_data: {source} {ref['path']} {ref['shape']} in {ref['seconds'] * 1000:.1f} ms")
+    return ref
 
-def data_preprocessing(data_b64: str):
+@cached_step()
+def data_preprocessing(data_ref: dict, dropna: str = "row", run_id=None):
     """
-    Deserializes base64-encoded pickled data, performs preprocessing,
-    and returns base64-encoded pickled clustered data.
+    Loads the raw data artifact, performs preprocessing,
+    and returns a reference to the scaled clustering data (.npy).
+    Args:
+        dropna (str): "row" drops every row with a missing value in any column
+            of file.csv, as the original full-frame dropna() did; "cluster"
+            only drops rows missing one of CLUSTER_COLUMNS.
     """
-    # decode -> bytes -> DataFrame
-    data_bytes = base64.b64decode(data_b64)
-    df = pickle.loads(data_bytes)
+    if dropna not in ("row", "cluster"):
+        raise ValueError(f"dropna must be 'row' or 'cluster', got {dropna!r}")
+    df = load_frame(data_ref)
 
-    df = df.dropna()
-    clustering_data = df[["BALANCE", "PURCHASES", "CREDIT_LIMIT"]]
+    if dropna == "row":
+        df = df[df[COMPLETE_COLUMN]]
+    df = df.dropna(subset=CLUSTER_COLUMNS)
+    # Scale (and later fit KMeans) in float64: a model fitted on float32 only
+    # predicts on float32 input, and test.csv is read as float64
+    clustering_data = df[CLUSTER_COLUMNS].astype(np.float64)
 
     min_max_scaler = MinMaxScaler()
     clustering_data_minmax = min_max_scaler.fit_transform(clustering_data)
 
-    # bytes -> base64 string for XCom
-    clustering_serialized_data = pickle.dumps(clustering_data_minmax)
-    return base64.b64encode(clustering_serialized_data).decode("ascii")
+    return save_array(clustering_data_minmax, run_id)
+
+
+def _fit_kmeans(data_ref: dict, k: int):
+    """
+    Fits one KMeans model for the sweep. Runs in a worker process, which
+    memory-maps the data itself instead of receiving a pickled copy.
+    """
+    data = load_array(data_ref)
+    return KMeans(n_clusters=k, **KMEANS_KWARGS).fit(data)
+
+
+def find_elbow(k_values: list, sse: list):
+    """
+    Runs KneeLocator over the integer grid k_values[0]..k_values[-1].
+    SSE for k values that were not fitted (adaptive search) is linearly
+    interpolated between fitted neighbours; for a full sweep this is exactly
+    KneeLocator(k_values, sse).
+    """
+    grid = np.arange(k_values[0], k_values[-1] + 1)
+    curve = np.interp(grid, k_values, sse)
+    kl = KneeLocator(grid, curve, curve="convex", direction="decreasing")
+    return None if kl.elbow is None else int(kl.elbow)
+
 
+def fallback_k(k_values: list, sse: list):
+    """
+    k to use when find_elbow finds no knee: the fitted k whose SSE lies
+    farthest below the straight line from the first to the last point
+    (KneeLocator without its sensitivity threshold), and at least 2 so the
+    clusters can be scored.
+    """
+    k = np.asarray(k_values, dtype=float)
+    sse = np.asarray(sse, dtype=float)
+    if len(k) < 2:
+        return max(2, int(k_values[-1]))
+    chord = np.interp(k, [k[0], k[-1]], [sse[0], sse[-1]])
+    candidates = k >= 2
+    if not candidates.any():
+        return 2
+    best = np.argmax(np.where(candidates, chord - sse, -np.inf))
+    return int(k_values[best])
 
-def build_save_model(data_b64: str, filename: str):
+
+def _add_centers(data, centers, n_new, rng):
     """
-    Builds a KMeans model on the preprocessed data and saves it.
-    Returns the SSE list (JSON-serializable).
+    Extends a set of centroids by n_new points using k-means++ style D^2 sampling.
     """
-    # decode -> bytes -> numpy array
-    data_bytes = base64.b64decode(data_b64)
-    df = pickle.loads(data_bytes)
+    d2 = np.full(len(data), np.inf)
+    for c in centers:
+        d2 = np.minimum(d2, ((data - c) ** 2).sum(axis=1))
+    new = []
+    for _ in range(n_new):
+        total = d2.sum()
+        i = rng.choice(len(data), p=d2 / total) if total > 0 else rng.integers(len(data))
+        new.append(data[i])
+        d2 = np.minimum(d2, ((data - data[i]) ** 2).sum(axis=1))
+    return np.vstack([centers, new])
+
 
-    kmeans_kwargs = {"init": "random", "n_init": 10, "max_iter": 300, "random_state": 42}
+def _warm_sweep(data, k_values: list):
+    """
+    Cheap approximate SSE curve: each k starts from the previous k's centroids
+    plus new D^2-sampled ones and runs a single KMeans init.
+    """
+    rng = np.random.default_rng(KMEANS_KWARGS["random_state"])
     sse = []
-    for k in range(1, 50):
-        kmeans = KMeans(n_clusters=k, **kmeans_kwargs)
-        kmeans.fit(df)
-        sse.append(kmeans.inertia_)
+    centers = None
+    for k in k_values:
+        if centers is None:
+            model = KMeans(n_clusters=k, **KMEANS_KWARGS).fit(data)
+        else:
+            init = _add_centers(data, centers, k - len(centers), rng)
+            model = KMeans(n_clusters=k, init=init, n_init=1, max_iter=KMEANS_KWARGS["max_iter"]).fit(data)
+        centers = model.cluster_centers_
+        sse.append(float(model.inertia_))
+    return sse
 
-    # NOTE: This saves the last-fitted model (k=49), matching your original intent.
-    output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "model")
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, filename)
+
+def _fit_exact(data_ref: dict, k_values: list, models: dict, n_jobs: int):
+    todo = [k for k in k_values if k not in models]
+    fitted = Parallel(n_jobs=n_jobs)(delayed(_fit_kmeans)(data_ref, k) for k in todo)
+    models.update(zip(todo, fitted))
+
+
+def _adaptive_sweep(data_ref: dict, k_min: int, k_max: int, step: int, n_jobs: int):
+    """
+    Coarse-to-fine elbow search.
+    1. Warm-started coarse sweep every `step` k values to locate the elbow.
+    2. Exact fits (same settings as the full sweep) for k_min, k_max and a
+       window of +/- step around it; the window grows while the elbow sits
+       too close to one of its edges.
+    Only exact fits are returned, so the elbow is decided on the same SSE
+    values the full sweep would produce.
+    """
+    coarse = sorted(set(range(k_min, k_max + 1, step)) | {k_max})
+    data = np.asarray(load_array(data_ref))
+    guess = find_elbow(coarse, _warm_sweep(data, coarse))
+    if guess is None:
+        guess = k_min
+
+    models = {}
+    lo, hi = max(k_min, guess - step), min(k_max, guess + step)
+    _fit_exact(data_ref, [k_min, k_max] + list(range(lo, hi + 1)), models, n_jobs)
+    while True:
+        k_values = sorted(models)
+        elbow = find_elbow(k_values, [models[k].inertia_ for k in k_values])
+        if elbow is None:
+            break
+        # The elbow needs exact neighbours on both sides to be trusted
+        if lo > k_min and elbow - lo < 2:
+            lo = max(k_min, lo - step)
+        elif hi < k_max and hi - elbow < step:
+            hi = min(k_max, hi + step)
+        else:
+            break
+        _fit_exact(data_ref, list(range(lo, hi + 1)), models, n_jobs)
+    print(f"Adaptive elbow search: {len(coarse)} warm-started + {len(models)} exact fits "
+          f"instead of {k_max - k_min + 1}")
+    return models
+
+
+@cached_step(ignore=("n_jobs",), files=lambda args: [os.path.join(MODEL_DIR, args["filename"])])
+def build_save_model(data_ref: dict, filename: str, k_min: int = 1, k_max: int = 49,
+                     n_jobs: int = -1, search: str = "full", coarse_step: int = 4, run_id=None):
+    """
+    Builds KMeans models for k = k_min..k_max (inclusive) in parallel worker
+    processes and saves the model for k_max.
+    Every fit uses random_state=42, so the results do not depend on n_jobs.
+    With search="adaptive" only the k values needed to pin down the elbow
+    are fitted (see _adaptive_sweep).
+    The centroids of every fitted model are kept in one (sum of k, n_features)
+    array so later tasks can reuse any k without refitting (see load_centers).
+    Returns:
+        dict: {"k": [...], "sse": [...], "centers": artifact reference} for the
+        fitted k values (JSON-serializable).
+    """
+    if search == "adaptive":
+        models = _adaptive_sweep(data_ref, k_min, k_max, coarse_step, n_jobs)
+    elif search == "full":
+        models = {}
+        _fit_exact(data_ref, list(range(k_min, k_max + 1)), models, n_jobs)
+    else:
+        raise ValueError("search must be 'full' or 'adaptive'.")
+    k_values = sorted(models)
+    sse = [float(models[k].inertia_) for k in k_values]
+    centers = np.vstack([models[k].cluster_centers_ for k in k_values])
+
+    # NOTE: This saves the last-fitted model (k=k_max), matching the original intent.
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    output_path = os.path.join(MODEL_DIR, filename)
     with open(output_path, "wb") as f:
-        pickle.dump(kmeans, f)
+        pickle.dump(models[k_max], f)
 
-    return sse  # list is JSON-safe
+    return {"k": k_values, "sse": sse, "centers": save_array(centers, run_id)}  # JSON-safe
 
 
-def load_model_elbow(filename: str, sse: list):
+def load_centers(sweep: dict, k: int):
+    """
+    Returns the centroids of the sweep's model for k as a (k, n_features)
+    array, or None if that k was not fitted.
+    """
+    if k not in sweep["k"]:
+        return None
+    # centroids are stored in increasing k order, k rows per model
+    offset = sum(j for j in sweep["k"] if j < k)
+    return np.array(load_array(sweep["centers"])[offset:offset + k])
+
+
+def load_model_elbow(filename: str, sweep: dict):
     """
     Loads the saved model and uses the elbow method to report k.
     Returns the first prediction (as a plain int) for test.csv.
@@ -76,12 +233,12 @@ def load_model_elbow(filename: str, sse: list):
     loaded_model = pickle.load(open(output_path, "rb"))
 
     # elbow for information/logging
-    kl = KneeLocator(range(1, 50), sse, curve="convex", direction="decreasing")
-    print(f"Optimal no. of clusters: {kl.elbow}")
+    print(f"Optimal no. of clusters: {find_elbow(sweep['k'], sweep['sse'])}")
 
     # predict on raw test data (matches your original code)
     df = pd.read_csv(os.path.join(os.path.dirname(__file__), "../data/test.csv"))
-    pred = loaded_model.predict(df)[0]
+    # KMeans.predict requires the dtype the model was fitted on
+    pred = loaded_model.predict(df.astype(loaded_model.cluster_centers_.dtype))[0]
 
     # ensure JSON-safe return
     try:
@@ -90,29 +247,61 @@ def load_model_elbow(filename: str, sse: list):
         # if not numeric, still return a JSON-friendly version
         return pred.item() if hasattr(pred, "item") else pred
     
-def generate_dashboard(data_b64: str, sse: list, optimal_k: int):
+@cached_step()
+def cluster_labels(data_ref: dict, sweep: dict, optimal_k: int, silhouette: str = "auto",
+                   sample_size: int = 10_000, seed: int = 42, run_id=None):
+    """
+    Assigns every row to the nearest centroid of the sweep's model for
+    optimal_k (no refit) and scores the result. Falls back to fitting a model
+    only if the sweep did not fit optimal_k.
+    silhouette, sample_size and seed select the scoring mode (see
+    silhouette_estimate); "auto" samples once there are more than sample_size rows.
+    Returns:
+        dict: {"labels": artifact reference (.npy), "counts": rows per cluster,
+        "silhouette": {"score", "ci_low", "ci_high", "n_scored", "mode"}}
+    """
+    data = load_array(data_ref)
+    centers = load_centers(sweep, optimal_k)
+    if centers is None:
+        print(f"k={optimal_k} was not fitted by the sweep, fitting it now")
+        centers = KMeans(n_clusters=optimal_k, **KMEANS_KWARGS).fit(data).cluster_centers_
+    labels = pairwise_distances_argmin(data, centers)
+    return {
+        "labels": save_array(labels, run_id),
+        "counts": np.bincount(labels, minlength=optimal_k).tolist(),
+        "silhouette": silhouette_estimate(data, labels, silhouette, sample_size, seed),
+    }
+
+
+def generate_dashboard(data_ref: dict, sweep: dict, optimal_k: int = None, silhouette: str = "auto",
+                       sample_size: int = 10_000, seed: int = 42, run_id=None):
     """
     Generates an HTML dashboard with elbow curve, cluster distribution,
-    and model metrics.
+    and model metrics. optimal_k defaults to the sweep's elbow (fallback_k
+    when there is none); silhouette, sample_size and seed are passed to
+    cluster_labels.
     """
     import plotly.graph_objects as go # type: ignore
     from plotly.subplots import make_subplots # type: ignore
 
-    # Decode data
-    data_bytes = base64.b64decode(data_b64)
-    data = pickle.loads(data_bytes)
+    sse = sweep["sse"]
+    if optimal_k is None:
+        optimal_k = find_elbow(sweep["k"], sweep["sse"])
+    if optimal_k is None:
+        optimal_k = fallback_k(sweep["k"], sweep["sse"])
+        print(f"No elbow found in the SSE curve, using k={optimal_k} (largest drop below the k_min-k_max chord)")
 
     # Compute silhouette score using optimal_k
-    kmeans_final = KMeans(n_clusters=optimal_k, init="random", n_init=10,
-                          max_iter=300, random_state=42)
-    labels = kmeans_final.fit_predict(data)
-    sil_score = silhouette_score(data, labels)
+    scored = cluster_labels(data_ref, sweep, optimal_k, silhouette, sample_size, seed, run_id=run_id)
+    sil = scored["silhouette"]
+    if sil["mode"] == "exact":
+        sil_text = f"{sil['score']:.4f}"
+    else:
+        sil_text = (f"{sil['score']:.4f} (95% CI {sil['ci_low']:.4f}–{sil['ci_high']:.4f}, "
+                    f"{sil['n_scored']:,} sampled rows)")
 
     # Cluster distribution counts
-    unique, counts = zip(*sorted(
-        zip(*[list(x) for x in [range(optimal_k),
-        [list(labels).count(i) for i in range(optimal_k)]]])
-    ))
+    unique, counts = range(optimal_k), scored["counts"]
 
     # Build subplots
     fig = make_subplots(
@@ -122,7 +311,7 @@ def generate_dashboard(data_b64: str, sse: list, optimal_k: int):
 
     # Elbow curve
     fig.add_trace(go.Scatter(
-        x=list(range(1, 50)), y=sse,
+        x=sweep["k"], y=sse,
         mode='lines+markers', name='SSE',
         line=dict(color='royalblue')
     ), row=1, col=1)
@@ -147,7 +336,7 @@ def generate_dashboard(data_b64: str, sse: list, optimal_k: int):
         <h2>Model Metrics</h2>
         <table style="border-collapse:collapse; width:400px;">
             <tr><td style="padding:8px;"><b>Optimal K (Elbow)</b></td><td>{optimal_k}</td></tr>
-            <tr><td style="padding:8px;"><b>Silhouette Score</b></td><td>{sil_score:.4f}</td></tr>
+            <tr><td style="padding:8px;"><b>Silhouette Score</b></td><td>{sil_text}</td></tr>
             <tr><td style="padding:8px;"><b>Min SSE</b></td><td>{min(sse):.4f}</td></tr>
             <tr><td style="padding:8px;"><b>Max SSE</b></td><td>{max(sse):.4f}</td></tr>
             <tr><td style="padding:8px;"><b>Generated At</b></td><td>{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC</td></tr>
@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+from sklearn.metrics import pairwise_distances # type: ignore
+
+# Two-sided normal quantiles for the supported confidence levels
+_Z = {0.9: 1.6449, 0.95: 1.96, 0.99: 2.5758}
+
+
+def silhouette_values(data, labels, rows, working_memory_mb: float = 64):
+    """
+    Silhouette coefficient of data[rows] measured against all of `data`, with
+    the same conventions as sklearn's silhouette_samples (0 for singleton
+    clusters). Distances are computed block by block so at most about
+    `working_memory_mb` of pairwise distances exist at once.
+    """
+    labels = np.asarray(labels)
+    n_clusters = int(labels.max()) + 1
+    # Sort by label so per-cluster distance sums are contiguous reductions
+    order = np.argsort(labels, kind="stable")
+    sorted_data = np.asarray(data)[order]
+    counts = np.bincount(labels, minlength=n_clusters)
+    present = np.flatnonzero(counts)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+
+    block = max(1, int(working_memory_mb * 2**20 // (8 * len(sorted_data))))
+    values = np.empty(len(rows))
+    for start in range(0, len(rows), block):
+        idx = rows[start:start + block]
+        dist = pairwise_distances(np.asarray(data)[idx], sorted_data)
+        sums = np.full((len(idx), n_clusters), np.nan)
+        sums[:, present] = np.add.reduceat(dist, starts, axis=1)
+        own = labels[idx]
+        own_size = counts[own]
+        a = sums[np.arange(len(idx)), own] / np.maximum(own_size - 1, 1)
+        means = sums / counts
+        means[np.arange(len(idx)), own] = np.inf
+        b = np.nanmin(means, axis=1)
+        s = (b - a) / np.maximum(a, b)
+        values[start:start + block] = np.where(own_size > 1, np.nan_to_num(s), 0.0)
+    return values
+
+
+def stratified_sample(labels, sample_size: int, seed: int = 42):
+    """
+    Draws about `sample_size` row indices without replacement, allocated to the
+    clusters in proportion to their size (at least 2 rows each when possible).
+    Returns:
+        (numpy.ndarray, dict): sampled row indices and {cluster: (N_h, n_h)}.
+    """
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(seed)
+    counts = np.bincount(labels)
+    rows, strata = [], {}
+    for h in np.flatnonzero(counts):
+        members = np.flatnonzero(labels == h)
+        take = min(len(members), max(2, round(sample_size * len(members) / len(labels))))
+        rows.append(rng.choice(members, size=take, replace=False))
+        strata[int(h)] = (len(members), take)
+    return np.concatenate(rows), strata
+
+
+def silhouette_estimate(data, labels, mode: str = "auto", sample_size: int = 10_000, seed: int = 42,
+                        confidence: float = 0.95, working_memory_mb: float = 64):
+    """
+    Mean silhouette coefficient, exactly or estimated from a stratified sample.
+
+    Args:
+        mode (str): "exact" scores every row (O(n^2) time, bounded memory),
+            "sample" scores a stratified sample of `sample_size` rows against
+            the full data (O(sample_size * n) time), "auto" samples only when
+            there are more than `sample_size` rows.
+        confidence (float): Confidence level of the interval (0.9, 0.95 or 0.99).
+    Returns:
+        dict: {"score", "ci_low", "ci_high", "n_scored", "mode"}. The interval
+        is the stratified-sampling standard error with finite population
+        correction; it collapses to the score in exact mode.
+    """
+    if mode not in ("auto", "exact", "sample"):
+        raise ValueError("mode must be 'auto', 'exact' or 'sample'.")
+    if confidence not in _Z:
+        raise ValueError(f"confidence must be one of {sorted(_Z)}.")
+    labels = np.asarray(labels)
+    n = len(labels)
+    if mode == "auto":
+        mode = "sample" if n > sample_size else "exact"
+
+    if mode == "exact":
+        score = float(silhouette_values(data, labels, np.arange(n), working_memory_mb).mean())
+        return {"score": score, "ci_low": score, "ci_high": score, "n_scored": n, "mode": mode}
+
+    rows, strata = stratified_sample(labels, sample_size, seed)
+    values = silhouette_values(data, labels, rows, working_memory_mb)
+    score, variance, offset = 0.0, 0.0, 0
+    for size, taken in strata.values():
+        s = values[offset:offset + taken]
+        offset += taken
+        weight = size / n
+        score += weight * s.mean()
+        if taken > 1:
+            variance += weight ** 2 * (1 - taken / size) * s.var(ddof=1) / taken
+    half = _Z[confidence] * math.sqrt(variance)
+    return {"score": float(score), "ci_low": float(score - half), "ci_high": float(score + half),
+            "n_scored": int(len(rows)), "mode": mode}
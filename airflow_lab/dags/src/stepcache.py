@@ -0,0 +1,222 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+from src.artifacts import ARTIFACT_ROOT, adopt_file, artifact_path
+
+# Cache location, size limit (MiB, 0 disables caching), eviction policy
+# ("lru": least recently used first, "fifo": oldest entry first) and a switch
+# that ignores existing entries (they are overwritten by the fresh results)
+CACHE_DIR = os.environ.get("LAB_CACHE_DIR", os.path.join(ARTIFACT_ROOT, "cache"))
+CACHE_MAX_MB = float(os.environ.get("LAB_CACHE_MAX_MB", 512))
+CACHE_EVICTION = os.environ.get("LAB_CACHE_EVICTION", "lru")
+FORCE_RECOMPUTE = os.environ.get("LAB_CACHE_FORCE", "0") == "1"
+
+# Reference fields that identify an artifact's content (not where it is stored)
+_FINGERPRINT_FIELDS = ("kind", "sha256", "source_sha256", "columns", "shape", "dtype")
+
+
+def _is_artifact(value):
+    return isinstance(value, dict) and value.get("kind") in ("npy", "parquet") and "path" in value
+
+
+def data_fingerprint(value):
+    """
+    Replaces artifact references (anywhere inside lists/dicts) by their content
+    fingerprint, so the same data stored for another run hashes the same.
+    """
+    if _is_artifact(value):
+        return {k: value[k] for k in _FINGERPRINT_FIELDS if k in value}
+    if isinstance(value, dict):
+        return {k: data_fingerprint(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [data_fingerprint(v) for v in value]
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def code_version(module_file: str):
+    """
+    SHA-256 of every Python source in the step's package (src/: the step's
+    module and the ingest, scoring and artifact helpers it calls) plus the
+    scikit-learn version; editing any of them or upgrading scikit-learn
+    invalidates the cached results.
+    """
+    import sklearn # type: ignore
+
+    package_dir = os.path.dirname(os.path.abspath(module_file))
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith(".py"):
+            with open(os.path.join(package_dir, name), "rb") as f:
+                source = f.read()
+            digest.update(f"{name}:{len(source)}:".encode())
+            digest.update(source)
+    digest.update(sklearn.__version__.encode())
+    return digest.hexdigest()
+
+
+def _walk_artifacts(value, fn):
+    # Applies fn to every artifact reference in a JSON-like result
+    if _is_artifact(value):
+        return fn(value)
+    if isinstance(value, dict):
+        return {k: _walk_artifacts(v, fn) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_walk_artifacts(v, fn) for v in value]
+    return value
+
+
+def _copy_atomic(src, dst):
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+class StepCache:
+    """
+    Content-addressed store of task results. Each entry is a directory named
+    after the step key holding meta.json (the JSON result) and copies of the
+    artifact and output files the step produced.
+    """
+
+    def __init__(self, root: str = CACHE_DIR, max_mb: float = CACHE_MAX_MB, eviction: str = CACHE_EVICTION):
+        if eviction not in ("lru", "fifo"):
+            raise ValueError("eviction must be 'lru' or 'fifo'.")
+        self.root = root
+        self.max_bytes = int(max_mb * 2**20)
+        self.eviction = eviction
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def key(self, step: str, inputs: dict, version: str):
+        payload = json.dumps({"step": step, "inputs": data_fingerprint(inputs), "code": version},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str, run_id=None):
+        """
+        Returns the stored result with its files restored (artifacts into the
+        current run's directory, output files to their original paths), or None.
+        """
+        entry = os.path.join(self.root, key)
+        try:
+            with open(os.path.join(entry, "meta.json")) as f:
+                meta = json.load(f)
+            for dst, name in meta["files"].items():
+                _copy_atomic(os.path.join(entry, name), dst)
+            result = _walk_artifacts(
+                meta["result"], lambda ref: adopt_file(os.path.join(entry, os.path.basename(ref["path"])), ref, run_id))
+        except (OSError, ValueError, KeyError):
+            # missing, partially evicted or corrupt entry: recompute
+            return None
+        os.utime(os.path.join(entry, "meta.json"))  # last-used time for LRU
+        return result
+
+    def put(self, key: str, result, files=()):
+        """
+        Stores a JSON result plus the artifacts it references and the given
+        output files, then evicts entries until the cache fits its size limit.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        entry = os.path.join(self.root, key)
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        def store(ref):
+            _copy_atomic(artifact_path(ref), os.path.join(tmp, os.path.basename(ref["path"])))
+            return ref
+
+        _walk_artifacts(result, store)
+        stored = {}
+        for i, path in enumerate(files):
+            name = f"file{i}_{os.path.basename(path)}"
+            shutil.copyfile(path, os.path.join(tmp, name))
+            stored[os.path.abspath(path)] = name
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"result": result, "files": stored, "created": time.time()}, f)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict()
+
+    def evict(self):
+        """
+        Removes entries (oldest created for "fifo", least recently used for
+        "lru") until the total size is within max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            meta = os.path.join(path, "meta.json")
+            if name.endswith(".tmp") or not os.path.exists(meta):
+                continue
+            if self.eviction == "fifo":
+                with open(meta) as f:
+                    order = json.load(f)["created"]
+            else:
+                order = os.path.getmtime(meta)
+            entries.append((order, path, _dir_size(path)))
+        total = sum(size for _, _, size in entries)
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            print(f"[cache] evicted {os.path.basename(path)[:12]} ({size / 2**20:.1f} MiB)")
+
+
+def cached_step(ignore=(), files=None):
+    """
+    Memoizes a task function on its inputs (artifact fingerprints and
+    parameters), the sources of its package and the scikit-learn version.
+
+    Args:
+        ignore (tuple): Parameters that do not affect the result (e.g. n_jobs).
+        files (callable): Maps the bound arguments to output files the task
+            writes besides its return value (e.g. the pickled model).
+    The wrapped function also accepts force_recompute=True, which (like
+    LAB_CACHE_FORCE=1) skips the lookup and refreshes the entry.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        module_file = inspect.getsourcefile(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, force_recompute=False, **kwargs):
+            cache = StepCache()
+            if not cache.enabled:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            inputs = {k: v for k, v in bound.arguments.items() if k != "run_id" and k not in ignore}
+            key = cache.key(fn.__name__, inputs, code_version(module_file))
+            run_id = bound.arguments.get("run_id")
+
+            if not (force_recompute or FORCE_RECOMPUTE):
+                result = cache.get(key, run_id)
+                if result is not None:
+                    print(f"[cache] hit {fn.__name__} {key[:12]}")
+                    return result
+            print(f"[cache] miss {fn.__name__} {key[:12]}")
+            result = fn(*args, **kwargs)
+            cache.put(key, result, files(bound.arguments) if files else ())
+            return result
+
+        return wrapper
+    return decorator
@@ -0,0 +1,95 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd # type: ignore
+from sklearn.cluster import MiniBatchKMeans # type: ignore
+from sklearn.preprocessing import MinMaxScaler # type: ignore
+
+from src.ingest import CLUSTER_COLUMNS, DATA_PATH
+from src.lab import KMEANS_KWARGS
+
+
+def iter_chunks(csv_path: str = DATA_PATH, chunksize: int = 100_000):
+    """
+    Yields the clustering columns of a CSV as float64 arrays, `chunksize` rows
+    at a time, with incomplete rows dropped. Only CLUSTER_COLUMNS are parsed.
+    """
+    reader = pd.read_csv(csv_path, usecols=CLUSTER_COLUMNS, dtype="float64", chunksize=chunksize)
+    for chunk in reader:
+        # keep the configured column order regardless of the file's order
+        values = chunk[CLUSTER_COLUMNS].dropna().to_numpy()
+        if len(values):
+            yield values
+
+
+def _minibatches(values, batch_size: int):
+    for start in range(0, len(values), batch_size):
+        yield values[start:start + batch_size]
+
+
+def fit_scaler_streaming(csv_path: str = DATA_PATH, chunksize: int = 100_000):
+    """
+    First pass: fits MinMaxScaler incrementally. The resulting min/max are
+    exactly those of a full fit_transform on the same rows.
+    """
+    scaler = MinMaxScaler()
+    for values in iter_chunks(csv_path, chunksize):
+        scaler.partial_fit(values)
+    return scaler
+
+
+def build_save_model_streaming(filename: str, k_min: int = 1, k_max: int = 49,
+                               csv_path: str = DATA_PATH, chunksize: int = 100_000,
+                               batch_size: int = 4096, epochs: int = 1):
+    """
+    Out-of-core alternative to data_preprocessing + build_save_model.
+
+    Peak memory is bounded by `chunksize` rows regardless of file size:
+    1. one pass fits the MinMaxScaler with partial_fit,
+    2. `epochs` passes train one MiniBatchKMeans per k with partial_fit,
+    3. one pass sums each model's SSE on the scaled data.
+    Rows with missing values in the clustering columns are dropped.
+    Returns:
+        dict: {"k": [...], "sse": [...]} (JSON-serializable), like build_save_model.
+    """
+    if batch_size < k_max:
+        raise ValueError("batch_size must be at least k_max.")
+    scaler = fit_scaler_streaming(csv_path, chunksize)
+    k_values = list(range(k_min, k_max + 1))
+    models = {
+        k: MiniBatchKMeans(n_clusters=k, init=KMEANS_KWARGS["init"], batch_size=batch_size,
+                           random_state=KMEANS_KWARGS["random_state"])
+        for k in k_values
+    }
+
+    # The first mini-batch must hold at least k_max rows to initialise every model
+    pending, fitted = [], False
+    for _ in range(epochs):
+        for values in iter_chunks(csv_path, chunksize):
+            scaled = scaler.transform(values)
+            if not fitted:
+                pending.append(scaled)
+                if sum(len(p) for p in pending) < k_max:
+                    continue
+                scaled, pending = np.vstack(pending), []
+            for batch in _minibatches(scaled, batch_size):
+                for model in models.values():
+                    model.partial_fit(batch)
+            fitted = True
+    if not fitted:
+        raise ValueError(f"Need at least {k_max} complete rows to fit k={k_max}.")
+
+    sse = dict.fromkeys(k_values, 0.0)
+    for values in iter_chunks(csv_path, chunksize):
+        scaled = scaler.transform(values)
+        for k, model in models.items():
+            # score() is the negative SSE of the given rows
+            sse[k] -= model.score(scaled)
+
+    output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "model")
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, filename), "wb") as f:
+        pickle.dump(models[k_max], f)
+
+    return {"k": k_values, "sse": [float(sse[k]) for k in k_values]}
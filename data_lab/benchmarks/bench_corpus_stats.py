@@ -0,0 +1,97 @@
+"""
+Benchmark the notebook's vocabulary and word-length statistics (a Python list
+of every token id + Counter, str.split() per line) against corpus_stats.py
+(chunked np.bincount over the flat token array, code-point word counts).
+
+Peak memory is measured with tracemalloc (NumPy buffers included) and covers
+the statistics only, not the input corpus. The Counter baseline builds a list
+of every token, so it only runs up to --max-counter tokens.
+
+Usage (from data_lab/):
+    python benchmarks/bench_corpus_stats.py
+    python benchmarks/bench_corpus_stats.py --sizes 1e6 1e7 --lines 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from corpus_stats import count_tokens, word_length_stats
+
+VOCAB_SIZE = 50257
+
+
+def measured(fn, *args):
+    """
+    Runs fn twice, returning (result, seconds, peak MiB allocated during the
+    call); the time comes from the run without tracemalloc, which slows Python code.
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = fn(*args)
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def counter_baseline(examples):
+    # Data_lab_1.ipynb, cell 13
+    all_token_ids = []
+    for input_ids in examples:
+        all_token_ids.extend(input_ids)
+    return Counter(all_token_ids)
+
+
+def split_baseline(texts):
+    # Data_lab_1.ipynb, cell 5
+    return [len(text.split()) for text in texts if text.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e6, 1e7, 1e8], help='Corpus sizes in tokens')
+    parser.add_argument('--max-counter', type=float, default=1e7)
+    parser.add_argument('--lines', type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print("token frequencies")
+    print(f"{'tokens':>12}  {'Counter':>16}  {'count_tokens':>16}")
+    for size in args.sizes:
+        # Zipf-like ids, as in natural text
+        tokens = np.minimum(rng.zipf(1.2, int(size)) - 1, VOCAB_SIZE - 1).astype(np.uint16)
+        counts, t_np, m_np = measured(count_tokens, tokens, VOCAB_SIZE)
+        baseline = "-"
+        if size <= args.max_counter:
+            examples = [chunk.tolist() for chunk in np.array_split(tokens, len(tokens) // 65)]
+            counter, t_py, m_py = measured(counter_baseline, examples)
+            assert len(counter) == len(counts) and sum(counter.values()) == counts.total()
+            assert [n for _, n in counter.most_common(20)] == [n for _, n in counts.most_common(20)]
+            baseline = f"{t_py:6.2f}s {m_py:6.0f}MiB"
+            del examples, counter
+        print(f"{len(tokens):>12,}  {baseline:>16}  {t_np:6.2f}s {m_np:6.0f}MiB")
+
+    r = random.Random(0)
+    words = ["".join(r.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(r.randint(2, 9))) for _ in range(20_000)]
+    texts = ["\n" if r.random() < 0.35 else " " + " ".join(r.choices(words, k=r.randint(1, 120))) + " \n"
+             for _ in range(args.lines)]
+    lengths, t_py, m_py = measured(split_baseline, texts)
+    stats, t_np, m_np = measured(word_length_stats, texts)
+    assert stats.count == len(lengths) and stats.max == max(lengths) and stats.mean == sum(lengths) / len(lengths)
+    print(f"\nwords per line ({args.lines:,} lines)")
+    print(f"{'split()':<20} {t_py:6.2f}s {m_py:6.0f}MiB")
+    print(f"{'word_length_stats':<20} {t_np:6.2f}s {m_np:6.0f}MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark the notebook's original group_texts (sum()-based list concatenation)
+against packing.py on synthetic WikiText-like corpora of 1M to 100M tokens.
+
+Every mode produces block sizes 128, 256 and 512 with the map(...,
+batch_size=1000) semantics of the notebook (each 1000-example batch drops its
+own remainder):
+    original      original group_texts, once per batch and block size
+    group_texts   packing.group_texts, once per batch and block size
+    pack (lists)  packing.pack over the whole corpus, all block sizes in one pass
+    pack (arrays) same, from per-example uint16 arrays (Dataset.with_format("numpy"))
+
+The list-based modes need the corpus as Python lists (~40 bytes per token), so
+they only run up to --max-list-tokens; the original only up to --max-original.
+
+Usage (from data_lab/):
+    python benchmarks/bench_packing.py
+    python benchmarks/bench_packing.py --sizes 1e6 1e7 --max-original 1e6
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from packing import group_texts, pack
+
+BLOCK_SIZES = [128, 256, 512]
+BATCH_SIZE = 1000
+VOCAB_SIZE = 50257
+
+
+def original_group_texts(examples, block_size):
+    # Data_lab_1.ipynb, cell 14
+    concatenated_inputs = sum(examples["input_ids"], [])
+    concatenated_masks = sum(examples["attention_mask"], [])
+    total_len = (len(concatenated_inputs) // block_size) * block_size
+    result_input_ids = [concatenated_inputs[i:i + block_size] for i in range(0, total_len, block_size)]
+    result_masks = [concatenated_masks[i:i + block_size] for i in range(0, total_len, block_size)]
+    return {"input_ids": result_input_ids, "attention_mask": result_masks}
+
+
+def synthetic_corpus(n_tokens, seed=0):
+    """
+    Token ids and per-line lengths shaped like tokenized WikiText-2: about a
+    third of the lines are empty, the rest average ~100 tokens.
+    Returns:
+        (numpy.ndarray, numpy.ndarray): uint16 token ids and line offsets.
+    """
+    rng = np.random.default_rng(seed)
+    n_lines = int(n_tokens / 65) + 1
+    lengths = np.where(rng.random(n_lines) < 0.35, 0, rng.geometric(1 / 100, n_lines))
+    offsets = np.r_[0, np.cumsum(lengths)]
+    offsets = offsets[offsets <= n_tokens]
+    tokens = rng.integers(0, VOCAB_SIZE, int(offsets[-1]), dtype=np.uint16)
+    return tokens, offsets
+
+
+def map_batches(fn, examples):
+    # What Dataset.map(fn, batched=True, batch_size=1000) does, minus Arrow I/O
+    n_blocks = {}
+    for block_size in BLOCK_SIZES:
+        n_blocks[block_size] = 0
+        for start in range(0, len(examples["input_ids"]), BATCH_SIZE):
+            batch = {k: v[start:start + BATCH_SIZE] for k, v in examples.items()}
+            n_blocks[block_size] += len(fn(batch, block_size)["input_ids"])
+    return n_blocks
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e6, 1e7, 1e8], help='Corpus sizes in tokens')
+    parser.add_argument('--max-list-tokens', type=float, default=1e7)
+    parser.add_argument('--max-original', type=float, default=1e7)
+    args = parser.parse_args()
+
+    print(f"block sizes {BLOCK_SIZES}, batch_size={BATCH_SIZE}")
+    print(f"{'tokens':>12}  {'original':>10}  {'group_texts':>11}  {'pack (lists)':>12}  {'pack (arrays)':>13}  "
+          f"{'Mtok/s':>7}  blocks@128")
+    for size in args.sizes:
+        tokens, offsets = synthetic_corpus(int(size))
+        arrays = np.split(tokens, offsets[1:-1])
+        examples = {"input_ids": arrays, "attention_mask": [np.ones_like(a) for a in arrays]}
+        blocks, t_arrays = timed(pack, examples, BLOCK_SIZES, BATCH_SIZE, ("input_ids", "attention_mask"), np.uint16)
+        counts = {bs: len(blocks[bs]["input_ids"]) for bs in BLOCK_SIZES}
+        del blocks, examples
+
+        t_original = t_grouped = t_lists = None
+        if size <= args.max_list_tokens:
+            ids = [a.tolist() for a in arrays]
+            examples = {"input_ids": ids, "attention_mask": [[1] * len(x) for x in ids]}
+            lists_blocks, t_lists = timed(pack, examples, BLOCK_SIZES, BATCH_SIZE)
+            grouped, t_grouped = timed(map_batches, group_texts, examples)
+            assert grouped == counts == {bs: len(lists_blocks[bs]["input_ids"]) for bs in BLOCK_SIZES}
+            if size <= args.max_original:
+                original, t_original = timed(map_batches, original_group_texts, examples)
+                assert original == counts
+                # block-for-block identical on the first batch
+                first = {k: v[:BATCH_SIZE] for k, v in examples.items()}
+                assert group_texts(first, 128) == original_group_texts(first, 128)
+            del examples, ids, lists_blocks
+
+        def fmt(seconds, width):
+            return f"{'-':>{width}}" if seconds is None else f"{seconds:>{width - 1}.2f}s"
+
+        print(f"{len(tokens):>12,}  {fmt(t_original, 10)}  {fmt(t_grouped, 11)}  {fmt(t_lists, 12)}  "
+              f"{fmt(t_arrays, 13)}  {len(tokens) / t_arrays / 1e6:>7.0f}  {counts[128]:,}")
+
+
+if __name__ == '__main__':
+    main()
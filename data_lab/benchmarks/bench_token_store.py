@@ -0,0 +1,86 @@
+"""
+Benchmark DataLoader throughput for the notebook's pipeline (a datasets.Dataset
+of Python lists with collate_fn = torch.tensor over lists) against a
+TokenStore (memory-mapped uint16 blocks, batches gathered in one slice).
+
+For each num_workers setting it reports batches/sec over shuffled batches and
+the bytes pickled into every worker process (the whole in-memory table for the
+Dataset, the path and index for the TokenStore).
+
+Usage (from data_lab/):
+    python benchmarks/bench_token_store.py
+    python benchmarks/bench_token_store.py --blocks 20000 --workers 0 2 4
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import torch
+from datasets import Dataset
+from torch.utils.data import DataLoader
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from token_store import TokenStore, collate, write_token_store
+
+VOCAB_SIZE = 50257
+
+
+def collate_fn(batch):
+    # Data_lab_1.ipynb, cell 20
+    input_ids = torch.tensor([example["input_ids"] for example in batch], dtype=torch.long)
+    return {"input_ids": input_ids, "labels": input_ids.clone()}
+
+
+def throughput(dataset, collate_fn, num_workers, batch_size, n_batches):
+    """
+    Batches per second over `n_batches` shuffled batches, worker start-up included
+    (as in the notebook's benchmark).
+    """
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True,
+                        collate_fn=collate_fn, num_workers=num_workers)
+    start = time.perf_counter()
+    for i, _ in enumerate(loader):
+        if i + 1 == n_batches:
+            break
+    return n_batches / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blocks', type=int, default=100_000)
+    parser.add_argument('--block-size', type=int, default=128)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--batches', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2])
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message=".*worker processes in total.*")
+
+    rng = np.random.default_rng(0)
+    blocks = rng.integers(0, VOCAB_SIZE, (args.blocks, args.block_size), dtype=np.uint16)
+    hf_ds = Dataset.from_dict({"input_ids": blocks.tolist(),
+                               "attention_mask": np.ones_like(blocks).tolist()})
+    path = os.path.join(tempfile.mkdtemp(), "bench")
+    write_token_store(path, blocks, VOCAB_SIZE)
+    store = TokenStore(path)
+    assert torch.equal(collate(store.__getitems__([3, 1]))["input_ids"],
+                       collate_fn([hf_ds[3], hf_ds[1]])["input_ids"])
+
+    print(f"{args.blocks:,} blocks x {args.block_size} tokens, batch_size={args.batch_size}, "
+          f"{args.batches} batches, {os.cpu_count()} CPU(s)")
+    print(f"pickled per worker: Dataset {len(pickle.dumps(hf_ds)) / 2**20:.1f} MiB, "
+          f"TokenStore {len(pickle.dumps(store))} bytes (file {os.path.getsize(store.bin_path) / 2**20:.1f} MiB, shared)")
+    print(f"{'num_workers':>11}  {'Dataset b/s':>11}  {'TokenStore b/s':>14}  {'speedup':>7}")
+    for num_workers in args.workers:
+        hf = throughput(hf_ds, collate_fn, num_workers, args.batch_size, args.batches)
+        ts = throughput(store, collate, num_workers, args.batch_size, args.batches)
+        print(f"{num_workers:>11}  {hf:>11.0f}  {ts:>14.0f}  {ts / hf:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
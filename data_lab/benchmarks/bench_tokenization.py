@@ -0,0 +1,100 @@
+"""
+Benchmark the cached tokenization stage (tokenization.py) against the
+notebook's single-process dataset.map(tokenize_function, batched=True).
+
+Runs fully offline: the corpus is a synthetic WikiText-like text file and the
+tokenizer a byte-level BPE trained on it and saved with save_pretrained().
+Reports the single-process baseline, a cold tokenize_corpus() per worker
+count, and a warm (cached) call.
+
+Usage (from data_lab/):
+    python benchmarks/bench_tokenization.py
+    python benchmarks/bench_tokenization.py --lines 200000 --workers 1 2 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+from transformers import PreTrainedTokenizerFast
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tokenization import load_tokenizer, read_lines, tokenize_corpus
+
+
+def synthetic_corpus(path, n_lines, seed=0):
+    """
+    Writes WikiText-like lines: about a third empty, the rest up to 120 words.
+    """
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 9)))
+             for _ in range(20_000)]
+    with open(path, "w") as f:
+        for _ in range(n_lines):
+            if rng.random() < 0.35:
+                f.write("\n")
+            else:
+                f.write(" " + " ".join(rng.choice(words) for _ in range(rng.randint(1, 120))) + " \n")
+
+
+def local_tokenizer(texts, directory, vocab_size=16_000):
+    """
+    Trains a GPT-2 style byte-level BPE on `texts` and saves it to `directory`.
+    """
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(vocab_size=vocab_size, special_tokens=["<|endoftext|>"],
+                                  initial_alphabet=pre_tokenizers.ByteLevel.alphabet())
+    tokenizer.train_from_iterator(texts, trainer)
+    PreTrainedTokenizerFast(tokenizer_object=tokenizer, eos_token="<|endoftext|>").save_pretrained(directory)
+
+
+def map_baseline(texts, tokenizer, batch_size=1000):
+    # dataset.map(tokenize_function, batched=True) without the Arrow writes
+    input_ids = []
+    for start in range(0, len(texts), batch_size):
+        input_ids.extend(tokenizer(texts[start:start + batch_size])["input_ids"])
+    return input_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2])
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    synthetic_corpus(os.path.join(root, "corpus.txt"), args.lines)
+    texts = read_lines(os.path.join(root, "corpus.txt"))
+    local_tokenizer(texts[:10_000], os.path.join(root, "tokenizer"))
+    tokenizer = load_tokenizer(os.path.join(root, "tokenizer"))
+
+    start = time.perf_counter()
+    baseline = map_baseline(texts, tokenizer)
+    t_baseline = time.perf_counter() - start
+    n_tokens = sum(map(len, baseline))
+    print(f"{len(texts):,} lines, {n_tokens:,} tokens, {os.cpu_count()} CPU(s)")
+    print(f"{'single process (map)':<34} {t_baseline:7.2f}s")
+
+    for workers in args.workers:
+        cache_dir = os.path.join(root, f"cache-{workers}")
+        start = time.perf_counter()
+        corpus = tokenize_corpus(texts, tokenizer, cache_dir=cache_dir, workers=workers)
+        print(f"{f'tokenize_corpus cold, {workers} worker(s)':<34} {time.perf_counter() - start:7.2f}s")
+    assert np.array_equal(corpus.tokens, np.concatenate([np.asarray(ids, dtype=corpus.tokens.dtype)
+                                                         for ids in baseline]))
+
+    start = time.perf_counter()
+    corpus = tokenize_corpus(texts, tokenizer, cache_dir=cache_dir)
+    assert corpus.manifest["cache_hit"]
+    print(f"{'tokenize_corpus warm (cached)':<34} {time.perf_counter() - start:7.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Vectorized corpus statistics in bounded memory.
+
+The notebook built one Python list of every token id (all_token_ids) and ran
+Counter over it, and counted words with str.split() line by line. Here token
+frequencies come from np.bincount over chunks of the flat token array, word
+counts from a chunked scan of the text's code points, and both are kept as
+small mergeable histograms (one slot per token id / per length), so memory
+depends on the vocabulary and the chunk size, not on the corpus size.
+
+TokenCounter answers what the summary cells asked Counter for (len(), total(),
+most_common()), plus least_common() and coverage().
+"""
+import numpy as np
+
+# Token ids per np.bincount call (~8 bytes each while counting)
+TOKEN_CHUNK = 2 ** 20
+# Lines per word-count chunk
+LINE_CHUNK = 4_000
+
+# Lookup table of the code points str.split() / str.strip() treat as
+# whitespace (all of them are below U+3001)
+_WHITESPACE = np.array([chr(c).isspace() for c in range(0x3001)] + [False])
+
+
+class TokenCounter:
+    """
+    Token frequencies as a dense int64 array indexed by token id. Counters from
+    different chunks or workers combine with merge().
+    """
+
+    def __init__(self, vocab_size):
+        self.counts = np.zeros(vocab_size, dtype=np.int64)
+
+    def update(self, tokens):
+        """
+        Adds the token ids of one chunk (any integer array).
+        Raises:
+            ValueError: If an id is outside [0, vocab_size).
+        """
+        tokens = np.asarray(tokens)
+        if tokens.size and (tokens.min() < 0 or tokens.max() >= len(self.counts)):
+            raise ValueError(f"token ids must be in [0, {len(self.counts)}).")
+        self.counts += np.bincount(tokens.ravel(), minlength=len(self.counts))
+
+    def merge(self, other):
+        """
+        Folds another counter into this one.
+        Returns:
+            TokenCounter: self, for chaining.
+        """
+        if len(other.counts) != len(self.counts):
+            raise ValueError("Cannot merge counters with different vocab sizes.")
+        self.counts += other.counts
+        return self
+
+    def __len__(self):
+        # number of distinct tokens seen, like len(Counter)
+        return int(np.count_nonzero(self.counts))
+
+    def __getitem__(self, token_id):
+        return int(self.counts[token_id])
+
+    def total(self):
+        """int: Number of tokens counted."""
+        return int(self.counts.sum())
+
+    def most_common(self, n):
+        """
+        Returns:
+            list: The n most frequent (token_id, count) pairs, most frequent
+            first; ties are ordered by token id (Counter orders them by first
+            occurrence).
+        """
+        used = np.flatnonzero(self.counts)
+        order = used[np.lexsort((used, -self.counts[used]))][:n]
+        return [(int(t), int(self.counts[t])) for t in order]
+
+    def least_common(self, n):
+        """
+        Returns:
+            list: The n rarest tokens that occur at least once, rarest first.
+        """
+        used = np.flatnonzero(self.counts)
+        order = used[np.lexsort((used, self.counts[used]))][:n]
+        return [(int(t), int(self.counts[t])) for t in order]
+
+    def coverage(self, vocab_size=None):
+        """
+        float: Fraction of the vocabulary (default: the counter's) that occurs.
+        """
+        return len(self) / (vocab_size or len(self.counts))
+
+
+def count_tokens(tokens, vocab_size, chunk_size=TOKEN_CHUNK):
+    """
+    Token frequencies of a flat token array (e.g. TokenizedCorpus.tokens, a
+    memory map), counted chunk by chunk so only one chunk is ever in memory.
+    Returns:
+        TokenCounter
+    """
+    counter = TokenCounter(vocab_size)
+    for start in range(0, len(tokens), chunk_size):
+        counter.update(tokens[start:start + chunk_size])
+    return counter
+
+
+class LengthStats:
+    """
+    Histogram of non-negative integer lengths (words or tokens per line) with
+    one slot per length: count, mean, min, max and binned histograms are exact,
+    and partial results combine with merge().
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, lengths):
+        """Adds a chunk of lengths."""
+        chunk = np.bincount(np.asarray(lengths, dtype=np.int64))
+        self._add(chunk)
+
+    def merge(self, other):
+        """
+        Folds another LengthStats into this one.
+        Returns:
+            LengthStats: self, for chaining.
+        """
+        self._add(other.counts)
+        return self
+
+    def _add(self, counts):
+        if len(counts) > len(self.counts):
+            self.counts = np.pad(self.counts, (0, len(counts) - len(self.counts)))
+        self.counts[:len(counts)] += counts
+
+    @property
+    def count(self):
+        """int: Number of lengths added."""
+        return int(self.counts.sum())
+
+    @property
+    def mean(self):
+        """float: Mean length."""
+        self._require_values()
+        return int(np.dot(np.arange(len(self.counts)), self.counts)) / self.count
+
+    @property
+    def min(self):
+        """int: Shortest length."""
+        self._require_values()
+        return int(np.flatnonzero(self.counts)[0])
+
+    @property
+    def max(self):
+        """int: Longest length."""
+        self._require_values()
+        return int(np.flatnonzero(self.counts)[-1])
+
+    def _require_values(self):
+        if self.count == 0:
+            raise ValueError("No lengths have been added.")
+
+    def histogram(self, bins=80):
+        """
+        Same bins and counts as np.histogram / plt.hist over the raw lengths.
+        Plot with plt.hist(edges[:-1], bins=edges, weights=counts).
+        Returns:
+            (numpy.ndarray, numpy.ndarray): counts and bin edges.
+        """
+        self._require_values()
+        return np.histogram(np.arange(len(self.counts)), bins=bins, range=(self.min, self.max),
+                            weights=self.counts)
+
+
+def word_counts(texts):
+    """
+    Number of str.split() words in each text, from one scan of the texts'
+    code points instead of a Python split per line.
+    Returns:
+        numpy.ndarray: int64 word count per text.
+    """
+    if not texts:
+        return np.zeros(0, dtype=np.int64)
+    # texts joined by a whitespace separator, so words never span two texts
+    joined = "\n".join(texts)
+    if not joined:
+        # a single empty text: no code points to scan
+        return np.zeros(len(texts), dtype=np.int64)
+    if joined.isascii():
+        # one byte per code point: index the table directly
+        is_word = ~_WHITESPACE[np.frombuffer(joined.encode("ascii"), dtype=np.uint8)]
+    else:
+        codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+        is_word = ~_WHITESPACE[np.minimum(codes, len(_WHITESPACE) - 1)]
+    starts = np.flatnonzero(is_word[1:] & ~is_word[:-1]) + 1
+    if is_word[0]:
+        starts = np.r_[0, starts]
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    text_starts = np.cumsum(lengths + 1) - lengths - 1
+    # each word start belongs to the last text starting at or before it
+    owner = np.searchsorted(text_starts, starts, side="right") - 1
+    return np.bincount(owner, minlength=len(texts))
+
+
+def word_length_stats(texts, chunk_size=LINE_CHUNK):
+    """
+    Words per non-empty line (the text_lengths of the notebook: lines where
+    text.strip() is not empty), computed chunk by chunk.
+    Returns:
+        LengthStats
+    """
+    stats = LengthStats()
+    for start in range(0, len(texts), chunk_size):
+        counts = word_counts(texts[start:start + chunk_size])
+        stats.update(counts[counts > 0])
+    return stats
+
+
+def token_length_stats(offsets):
+    """
+    Tokens per text from the offsets of a flattened corpus
+    (packing.flatten, TokenizedCorpus.offsets).
+    Returns:
+        LengthStats
+    """
+    stats = LengthStats()
+    stats.update(np.diff(offsets))
+    return stats
@@ -0,0 +1,117 @@
+"""
+Array-backed sequence packing for causal language model training.
+
+The notebook's original group_texts joined each batch with
+sum(examples["input_ids"], []) (quadratic list concatenation) and then sliced
+Python lists into blocks. Here every column is copied once into a flat NumPy
+buffer with per-example offsets, and blocks are cut from that buffer with
+array operations only, for any number of block sizes in the same pass.
+
+group_texts below is a drop-in replacement for the notebook function (same
+dict of lists of Python ints); pack() returns the blocks as 2-D arrays.
+"""
+import itertools
+
+import numpy as np
+
+COLUMNS = ("input_ids", "attention_mask")
+
+
+def flatten(sequences, dtype=np.int64):
+    """
+    Concatenates a list of token sequences into one flat array in linear time.
+    Args:
+        sequences (list): Lists (or 1-D arrays) of token ids.
+        dtype: Dtype of the flat buffer (e.g. np.uint16 for a GPT-2 vocab).
+    Returns:
+        (numpy.ndarray, numpy.ndarray): The flat buffer and the offsets
+        (length len(sequences) + 1); sequence i is flat[offsets[i]:offsets[i + 1]].
+    """
+    lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if len(sequences) and all(isinstance(seq, np.ndarray) for seq in sequences):
+        flat = np.concatenate(sequences).astype(dtype, copy=False)
+    else:
+        flat = np.fromiter(itertools.chain.from_iterable(sequences), dtype=dtype, count=int(offsets[-1]))
+    return flat, offsets
+
+
+def block_starts(offsets, block_size, batch_size=None):
+    """
+    Start positions (in the flat buffer) of every full block.
+    Args:
+        offsets (numpy.ndarray): Offsets returned by flatten().
+        block_size (int): Tokens per block.
+        batch_size (int): Cut each group of `batch_size` examples separately,
+            dropping each group's remainder, like Dataset.map(group_texts,
+            batched=True, batch_size=batch_size). None packs the whole corpus
+            as one stream.
+    Returns:
+        numpy.ndarray: int64 start positions, in order.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be a positive integer.")
+    n_examples = len(offsets) - 1
+    step = n_examples if batch_size is None else batch_size
+    edges = offsets[np.unique(np.r_[np.arange(0, n_examples, max(step, 1)), n_examples])]
+    group_starts, group_blocks = edges[:-1], np.diff(edges) // block_size
+    # block j of a group starts at group_start + j * block_size
+    first = np.cumsum(group_blocks) - group_blocks
+    index = np.arange(int(group_blocks.sum()), dtype=np.int64)
+    return np.repeat(group_starts, group_blocks) + (index - np.repeat(first, group_blocks)) * block_size
+
+
+def cut_blocks(flat, offsets, block_size, batch_size=None):
+    """
+    Cuts a flat buffer into a [n_blocks, block_size] array. Without batch_size
+    the result is a zero-copy view of `flat`; with it, one copy of the kept rows.
+    """
+    if batch_size is None:
+        n_blocks = int(offsets[-1]) // block_size
+        return flat[:n_blocks * block_size].reshape(n_blocks, block_size)
+    starts = block_starts(offsets, block_size, batch_size)
+    if len(starts) == 0:
+        return np.empty((0, block_size), dtype=flat.dtype)
+    return np.lib.stride_tricks.sliding_window_view(flat, block_size)[starts]
+
+
+def pack(examples, block_sizes, batch_size=None, columns=COLUMNS, dtype=np.int64):
+    """
+    Packs tokenized examples into fixed-length blocks for several block sizes,
+    flattening each column only once.
+    Args:
+        examples (dict): Column name -> list of token sequences (a batch from
+            Dataset.map, or tokenized_ds[:]).
+        block_sizes (list): Block sizes to produce, e.g. [128, 256, 512].
+        batch_size (int): See block_starts(); 1000 reproduces the notebook's
+            map(..., batch_size=1000) counts.
+        columns (tuple): Columns to pack.
+        dtype: Dtype of the token buffers.
+    Returns:
+        dict: block_size -> {column: numpy.ndarray of shape [n_blocks, block_size]}.
+    """
+    flat = {column: flatten(examples[column], dtype) for column in columns}
+    return {
+        block_size: {column: cut_blocks(buffer, offsets, block_size, batch_size)
+                     for column, (buffer, offsets) in flat.items()}
+        for block_size in block_sizes
+    }
+
+
+def group_texts(examples, block_size, return_numpy=False):
+    """
+    Drop-in replacement for the notebook's group_texts: concatenates a batch of
+    examples and splits it into block_size chunks, dropping the remainder.
+    Args:
+        examples (dict): Batch with "input_ids" and "attention_mask".
+        block_size (int): Tokens per block.
+        return_numpy (bool): Return 2-D arrays (accepted by Dataset.map and
+            cheaper to build) instead of lists of Python ints.
+    Returns:
+        dict: {"input_ids": blocks, "attention_mask": blocks}.
+    """
+    blocks = pack(examples, [block_size])[block_size]
+    if return_numpy:
+        return blocks
+    return {column: rows.tolist() for column, rows in blocks.items()}
@@ -0,0 +1,32 @@
+import pytest
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from corpus_stats import word_counts, word_length_stats
+
+
+def test_word_counts_match_split():
+    """Test word counts against str.split(), including Unicode whitespace"""
+    texts = [" The cat  sat \n", "\n", "", "one", "a\tb　c", "café naïve x ", "   "]
+    assert word_counts(texts).tolist() == [len(text.split()) for text in texts]
+
+
+def test_word_counts_empty_texts():
+    """Test inputs with no code points to scan"""
+    assert word_counts([]).tolist() == []
+    assert word_counts([""]).tolist() == [0]
+    assert word_counts(["", ""]).tolist() == [0, 0]
+    assert word_counts([""]).dtype == np.int64
+
+
+def test_word_length_stats_last_chunk_empty():
+    """Test a corpus whose last chunk is a single empty line"""
+    texts = [" some words here \n"] * 4000 + [""]
+    stats = word_length_stats(texts, chunk_size=4000)
+    assert stats.count == 4000
+    assert stats.mean == 3.0
+
+    with pytest.raises(ValueError):
+        word_length_stats([""]).mean
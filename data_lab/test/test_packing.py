@@ -0,0 +1,78 @@
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from packing import group_texts, pack
+
+
+def original_group_texts(examples, block_size):
+    # Data_lab_1.ipynb, cell 14 (before packing.py)
+    concatenated_inputs = sum(examples["input_ids"], [])
+    concatenated_masks = sum(examples["attention_mask"], [])
+    total_len = (len(concatenated_inputs) // block_size) * block_size
+    result_input_ids = [concatenated_inputs[i:i + block_size] for i in range(0, total_len, block_size)]
+    result_masks = [concatenated_masks[i:i + block_size] for i in range(0, total_len, block_size)]
+    return {"input_ids": result_input_ids, "attention_mask": result_masks}
+
+
+def make_examples(n_examples, seed=0):
+    # WikiText-like: about a third of the lines are empty
+    rng = np.random.default_rng(seed)
+    lengths = np.where(rng.random(n_examples) < 0.35, 0, rng.integers(1, 60, n_examples))
+    ids = [rng.integers(0, 50257, n).tolist() for n in lengths]
+    masks = [rng.integers(0, 2, n).tolist() for n in lengths]
+    return {"input_ids": ids, "attention_mask": masks}
+
+
+def original_map(examples, block_size, batch_size):
+    # Dataset.map(original_group_texts, batched=True, batch_size=batch_size)
+    out = {"input_ids": [], "attention_mask": []}
+    for start in range(0, len(examples["input_ids"]), batch_size):
+        batch = {k: v[start:start + batch_size] for k, v in examples.items()}
+        for column, blocks in original_group_texts(batch, block_size).items():
+            out[column].extend(blocks)
+    return out
+
+
+def test_group_texts_matches_original():
+    """Test group_texts block for block against the sum()-based version"""
+    examples = make_examples(200)
+    for block_size in (1, 7, 32, 128):
+        expected = original_group_texts(examples, block_size)
+        assert group_texts(examples, block_size) == expected
+        blocks = group_texts(examples, block_size, return_numpy=True)
+        assert {k: v.tolist() for k, v in blocks.items()} == expected
+
+
+def test_pack_batched_matches_original_map():
+    """Test pack(batch_size=...) against the original applied batch by batch"""
+    examples = make_examples(1050, seed=1)
+    block_sizes = [16, 64, 128]
+    for batch_size in (1, 100, 1000):
+        blocks = pack(examples, block_sizes, batch_size=batch_size)
+        for block_size in block_sizes:
+            expected = original_map(examples, block_size, batch_size)
+            assert {k: v.tolist() for k, v in blocks[block_size].items()} == expected
+
+
+def test_pack_array_inputs_match_original():
+    """Test uint16 array inputs (Dataset.with_format("numpy")) against the original"""
+    examples = make_examples(300, seed=2)
+    examples["input_ids"] = [[token % 2**16 for token in seq] for seq in examples["input_ids"]]
+    arrays = {k: [np.asarray(seq, dtype=np.uint16) for seq in v] for k, v in examples.items()}
+    blocks = pack(arrays, [32], batch_size=100, dtype=np.uint16)[32]
+    assert {k: v.tolist() for k, v in blocks.items()} == original_map(examples, 32, 100)
+
+
+def test_remainder_dropped():
+    """Test that the trailing partial block is dropped, and short batches yield nothing"""
+    examples = {"input_ids": [[1, 2, 3], [], [4, 5, 6, 7]], "attention_mask": [[1, 1, 1], [], [1, 1, 1, 0]]}
+    for block_size in (2, 3, 7, 8):
+        assert group_texts(examples, block_size) == original_group_texts(examples, block_size)
+    assert group_texts(examples, 3)["input_ids"] == [[1, 2, 3], [4, 5, 6]]
+    assert group_texts(examples, 8) == {"input_ids": [], "attention_mask": []}
+    # each batch drops its own remainder: [1, 2, 3] | [] | [4, 5, 6, 7] with batch_size=1
+    blocks = pack(examples, [2], batch_size=1)[2]
+    assert blocks["input_ids"].tolist() == original_map(examples, 2, 1)["input_ids"] == [[1, 2], [4, 5], [6, 7]]
+    assert pack(examples, [5], batch_size=2)[5]["input_ids"].shape == (0, 5)
@@ -0,0 +1,71 @@
+import pickle
+import pytest
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from token_store import TokenStore, collate, write_token_store
+
+
+@pytest.fixture
+def blocks():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 50257, (37, 16))
+
+
+@pytest.fixture
+def store(tmp_path, blocks):
+    write_token_store(str(tmp_path / "store"), blocks, 50257)
+    return TokenStore(str(tmp_path / "store"))
+
+
+def test_getitem(store, blocks):
+    """Test single-index access, including negative indices"""
+    assert len(store) == len(blocks)
+    assert store.dtype == np.uint16
+    for i in (0, 5, 36, -1, -37):
+        assert store[i].tolist() == blocks[i].tolist()
+    with pytest.raises(IndexError):
+        store[37]
+    with pytest.raises(IndexError):
+        store[-38]
+
+
+def test_getitems(store, blocks):
+    """Test batched access: contiguous runs, shuffled and negative indices"""
+    for indices in ([0, 1, 2, 3], [36], [3, 0, 17, 17], [-1, -2, 0], [35, 36], []):
+        batch = store.__getitems__(indices)
+        assert batch.shape == (len(indices), 16)
+        assert batch.tolist() == blocks[indices].tolist()
+        assert batch.tolist() == [store[i].tolist() for i in indices]
+    # a sequential run is returned as a view of the map
+    assert np.shares_memory(store.__getitems__([4, 5, 6]), store.blocks)
+
+
+def test_getitems_out_of_range(store):
+    """Test that batched access raises IndexError like single-index access"""
+    for indices in ([0, 37], [-38], [40, 41, 42]):
+        with pytest.raises(IndexError):
+            store.__getitems__(indices)
+
+
+def test_matches_in_memory_dataset(store, blocks):
+    """Test the store against a datasets.Dataset of the same blocks"""
+    datasets = pytest.importorskip("datasets")
+    torch = pytest.importorskip("torch")
+    from torch.utils.data import DataLoader
+
+    ds = datasets.Dataset.from_dict({"input_ids": blocks.tolist()})
+    assert [store[i].tolist() for i in range(len(store))] == ds["input_ids"]
+    assert store.__getitems__([9, 2, -1]).tolist() == ds[[9, 2, 36]]["input_ids"]
+
+    # unpickled copies (DataLoader workers) map the file again
+    clone = pickle.loads(pickle.dumps(store))
+    assert clone.__getitems__([9, 2, -1]).tolist() == ds[[9, 2, 36]]["input_ids"]
+
+    loader = DataLoader(store, batch_size=8, collate_fn=collate)
+    batches = [batch["input_ids"] for batch in loader]
+    expected = torch.tensor(ds["input_ids"])
+    assert torch.equal(torch.cat(batches), expected)
+    assert all(batch.dtype == torch.int64 for batch in batches)
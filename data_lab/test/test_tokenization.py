@@ -0,0 +1,107 @@
+import os
+import pytest
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tokenization
+from tokenization import tokenize_corpus
+
+TEXTS = [
+    " = Valkyria Chronicles III = \n", "\n", "", " Senjō no Valkyria 3 : Unrecorded Chronicles \n",
+    " The game began development in 2010 , carrying over a large portion of the work \n",
+    " It met with positive sales in Japan , and was praised by both Japanese and western critics . \n",
+] * 4 + [" café naïve — 東京 \n", " the end \n"]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    # small byte-level BPE trained offline, like benchmarks/bench_tokenization.py
+    tokenizers = pytest.importorskip("tokenizers")
+    transformers = pytest.importorskip("transformers")
+    from tokenizers import decoders, models, pre_tokenizers, trainers
+
+    backend = tokenizers.Tokenizer(models.BPE())
+    backend.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    backend.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(vocab_size=400, special_tokens=["<|endoftext|>"],
+                                  initial_alphabet=pre_tokenizers.ByteLevel.alphabet())
+    backend.train_from_iterator(TEXTS, trainer)
+    return transformers.PreTrainedTokenizerFast(tokenizer_object=backend, eos_token="<|endoftext|>")
+
+
+def assert_matches_tokenizer(corpus, tokenizer):
+    expected = tokenizer(TEXTS)["input_ids"]
+    assert len(corpus) == len(TEXTS)
+    assert [corpus[i].tolist() for i in range(len(corpus))] == expected
+    assert corpus.columns() == {"input_ids": expected, "attention_mask": tokenizer(TEXTS)["attention_mask"]}
+
+
+def test_cold_run(tmp_path, tokenizer):
+    """Test a cold run against a direct tokenizer call"""
+    corpus = tokenize_corpus(TEXTS, tokenizer, cache_dir=str(tmp_path), workers=1, shard_size=7)
+    assert corpus.manifest["cache_hit"] is False
+    assert corpus.manifest["n_shards"] == 4
+    assert_matches_tokenizer(corpus, tokenizer)
+    # shards are merged and removed
+    assert not [name for name in os.listdir(corpus.directory) if name.startswith("shards")]
+
+
+def test_cold_run_process_pool(tmp_path, tokenizer):
+    """Test that worker processes produce the same tokens"""
+    corpus = tokenize_corpus(TEXTS, tokenizer, cache_dir=str(tmp_path), workers=2, shard_size=5)
+    assert_matches_tokenizer(corpus, tokenizer)
+
+
+def test_warm_cache_hit(tmp_path, tokenizer, monkeypatch):
+    """Test that a second call loads the cache without tokenizing"""
+    cold = tokenize_corpus(TEXTS, tokenizer, cache_dir=str(tmp_path), workers=1, shard_size=7)
+
+    def fail(*args):
+        raise AssertionError("a cache hit must not tokenize")
+
+    monkeypatch.setattr(tokenization, "_tokenize_shard", fail)
+    warm = tokenize_corpus(TEXTS, tokenizer, cache_dir=str(tmp_path), workers=1, shard_size=3)
+    assert warm.manifest["cache_hit"] is True
+    assert warm.directory == cold.directory
+    assert_matches_tokenizer(warm, tokenizer)
+
+
+def interrupted_run(tmp_path, tokenizer, monkeypatch, shard_size, n_shards):
+    # tokenize_corpus that dies after writing n_shards shards
+    written = []
+    tokenize_shard = tokenization._tokenize_shard
+
+    def crash_after(texts, dtype, path):
+        if len(written) == n_shards:
+            raise KeyboardInterrupt
+        written.append(tokenize_shard(texts, dtype, path))
+        return path
+
+    monkeypatch.setattr(tokenization, "_tokenize_shard", crash_after)
+    with pytest.raises(KeyboardInterrupt):
+        tokenize_corpus(TEXTS, tokenizer, cache_dir=str(tmp_path), workers=1, shard_size=shard_size)
+    monkeypatch.setattr(tokenization, "_tokenize_shard", tokenize_shard)
+    return written
+
+
+def test_resume_same_shard_size(tmp_path, tokenizer, monkeypatch):
+    """Test that a resumed run reuses the shards an interrupted run wrote"""
+    written = interrupted_run(tmp_path, tokenizer, monkeypatch, shard_size=5, n_shards=2)
+    calls = []
+    tokenize_shard = tokenization._tokenize_shard
+    monkeypatch.setattr(tokenization, "_tokenize_shard", lambda *args: calls.append(args[2]) or tokenize_shard(*args))
+
+    corpus = tokenize_corpus(TEXTS, tokenizer, cache_dir=str(tmp_path), workers=1, shard_size=5)
+    assert corpus.manifest["cache_hit"] is False
+    assert len(calls) == corpus.manifest["n_shards"] - len(written)
+    assert not set(calls) & set(written)
+    assert_matches_tokenizer(corpus, tokenizer)
+
+
+def test_resume_after_shard_size_change(tmp_path, tokenizer, monkeypatch):
+    """Test that shards of another shard size are never mixed into a resumed run"""
+    interrupted_run(tmp_path, tokenizer, monkeypatch, shard_size=5, n_shards=2)
+    corpus = tokenize_corpus(TEXTS, tokenizer, cache_dir=str(tmp_path), workers=1, shard_size=7)
+    assert corpus.manifest["n_shards"] == 4
+    assert_matches_tokenizer(corpus, tokenizer)
+    assert not [name for name in os.listdir(corpus.directory) if name.startswith("shards")]
@@ -0,0 +1,175 @@
+"""
+On-disk token store for language model training.
+
+A store is two files: <name>.bin, the packed blocks as one contiguous
+uint16 (vocab <= 65,536) or uint32 array of shape [n_blocks, block_size], and
+<name>.json, a small index with the dtype, shape and vocab size.
+
+TokenStore is a map-style dataset over a read-only memory map of the .bin
+file. Items are zero-copy views, a batch is one slice (or one gather for
+shuffled indices), and DataLoader workers only pickle the path: each worker
+maps the same file, so they share the page cache instead of holding their own
+copy of the dataset.
+
+Example:
+    >>> blocks = pack(tokenized_ds[:], [128], batch_size=1000)[128]["input_ids"]
+    >>> write_token_store("wikitext2_gpt2_128", blocks, tokenizer.vocab_size)
+    >>> store = TokenStore("wikitext2_gpt2_128")
+    >>> loader = DataLoader(store, batch_size=8, shuffle=True, collate_fn=collate, num_workers=2)
+"""
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def token_dtype(vocab_size):
+    """
+    Smallest unsigned dtype that holds every token id of a vocabulary.
+    """
+    if vocab_size <= 2 ** 16:
+        return np.dtype(np.uint16)
+    if vocab_size <= 2 ** 32:
+        return np.dtype(np.uint32)
+    raise ValueError("vocab_size must be at most 2**32.")
+
+
+def store_paths(path):
+    """
+    Returns:
+        (str, str): The .bin and .json paths of the store at `path`.
+    """
+    return f"{path}.bin", f"{path}.json"
+
+
+def write_token_store(path, blocks, vocab_size, metadata=None):
+    """
+    Writes packed blocks as a token store. Both files are written to temporary
+    names and renamed, so readers never see a partial store.
+    Args:
+        path (str): Store path without extension.
+        blocks (numpy.ndarray or iterable): A [n_blocks, block_size] array, or
+            an iterable of such chunks (e.g. one per pack() batch) written as
+            they arrive.
+        vocab_size (int): Tokenizer vocabulary size; picks uint16 or uint32.
+        metadata (dict): Extra JSON fields for the index (tokenizer name, ...).
+    Returns:
+        dict: The index written to <path>.json.
+    Raises:
+        ValueError: If a chunk is not 2-D, has another block size, or holds ids
+            outside [0, vocab_size).
+    """
+    dtype = token_dtype(vocab_size)
+    bin_path, index_path = store_paths(path)
+    if isinstance(blocks, np.ndarray):
+        blocks = [blocks]
+
+    block_size, n_blocks = None, 0
+    try:
+        with open(f"{bin_path}.tmp", "wb") as f:
+            for chunk in blocks:
+                chunk = np.asarray(chunk)
+                if chunk.ndim != 2 or (block_size is not None and chunk.shape[1] != block_size):
+                    raise ValueError("blocks must be 2-D with the same block size.")
+                block_size = chunk.shape[1]
+                if chunk.size and (chunk.min() < 0 or chunk.max() >= vocab_size):
+                    raise ValueError(f"token ids must be in [0, {vocab_size}).")
+                np.ascontiguousarray(chunk, dtype=dtype).tofile(f)
+                n_blocks += len(chunk)
+        if block_size is None:
+            raise ValueError("blocks cannot be empty.")
+    except BaseException:
+        os.remove(f"{bin_path}.tmp")
+        raise
+
+    index = {
+        "format_version": FORMAT_VERSION,
+        "dtype": dtype.name,
+        "n_blocks": n_blocks,
+        "block_size": block_size,
+        "vocab_size": vocab_size,
+        **(metadata or {}),
+    }
+    with open(f"{index_path}.tmp", "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(f"{bin_path}.tmp", bin_path)
+    os.replace(f"{index_path}.tmp", index_path)
+    return index
+
+
+class TokenStore:
+    """
+    Map-style dataset over a token store; store[i] is a read-only uint16/uint32
+    view of block i and store.__getitems__(indices) returns a whole batch as one
+    [len(indices), block_size] array (the DataLoader calls it when defined).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        bin_path, index_path = store_paths(path)
+        with open(index_path) as f:
+            self.index = json.load(f)
+        if self.index.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported token store format: {self.index.get('format_version')}")
+        self.bin_path = bin_path
+        self.shape = (self.index["n_blocks"], self.index["block_size"])
+        self.dtype = np.dtype(self.index["dtype"])
+        expected = self.shape[0] * self.shape[1] * self.dtype.itemsize
+        if os.path.getsize(bin_path) != expected:
+            raise ValueError(f"{bin_path} does not match its index ({expected} bytes expected).")
+        self._blocks = None
+
+    @property
+    def blocks(self):
+        """numpy.memmap: All blocks, mapped on first use in each process."""
+        if self._blocks is None and self.shape[0] == 0:
+            # an empty file cannot be mapped
+            self._blocks = np.empty(self.shape, dtype=self.dtype)
+        elif self._blocks is None:
+            self._blocks = np.memmap(self.bin_path, dtype=self.dtype, mode="r", shape=self.shape)
+        return self._blocks
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, idx):
+        return self.blocks[idx]
+
+    def __getitems__(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        n_blocks = len(self)
+        if len(indices) and (indices.min() < -n_blocks or indices.max() >= n_blocks):
+            raise IndexError(f"block index out of range for {n_blocks} blocks.")
+        # negative indices count from the end, as in store[i]
+        indices = np.where(indices < 0, indices + n_blocks, indices)
+        if len(indices) and np.all(np.diff(indices) == 1):
+            # sequential sampler: contiguous run, still a view
+            return self.blocks[indices[0]:indices[-1] + 1]
+        return self.blocks[indices]
+
+    def __getstate__(self):
+        # workers get the path only and map the file themselves
+        state = self.__dict__.copy()
+        state["_blocks"] = None
+        return state
+
+
+def collate(batch):
+    """
+    collate_fn for TokenStore: one dtype conversion of the whole batch instead
+    of torch.tensor() over Python lists.
+    Args:
+        batch: A [batch_size, block_size] array from __getitems__, or a list
+            of block views (DataLoader with a custom batch_sampler).
+    Returns:
+        dict: {"input_ids": LongTensor, "labels": LongTensor}, as collate_fn in
+        the notebook.
+    """
+    import torch
+
+    if not isinstance(batch, np.ndarray):
+        batch = np.stack(batch)
+    input_ids = torch.from_numpy(batch.astype(np.int64))
+    return {"input_ids": input_ids, "labels": input_ids.clone()}
@@ -0,0 +1,257 @@
+"""
+Parallel, cached tokenization stage.
+
+tokenize_corpus() splits a list of texts into shards, tokenizes them in a
+process pool and stores the result as one flat token array (uint16/uint32,
+see token_store.token_dtype) plus per-text offsets, in a cache directory
+keyed by a hash of the corpus and of the tokenizer (vocab, merges,
+normalization and special tokens). Re-running the notebook, or comparing
+several tokenizers, loads the cached arrays instead of tokenizing again; an
+interrupted run resumes from the shards already written.
+
+Everything works offline: texts can come from a local file (read_lines) and
+the tokenizer from a directory written by tokenizer.save_pretrained().
+
+Example:
+    >>> corpus = tokenize_corpus(read_lines("wiki.train.raw"), "tokenizers/gpt2")
+    >>> corpus[0]                       # token ids of the first text
+    >>> blocks = corpus.pack([128, 256, 512], batch_size=1000)
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from packing import cut_blocks, flatten
+from token_store import token_dtype
+
+FORMAT_VERSION = 1
+# Cache location and texts per shard (one task per shard in the process pool)
+CACHE_DIR = os.environ.get("DATA_LAB_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "tokenized"))
+SHARD_SIZE = int(os.environ.get("TOKENIZE_SHARD_SIZE", 10_000))
+
+
+def read_lines(path, encoding="utf-8"):
+    """
+    Reads a local text corpus, one example per line. Line endings are kept, as
+    in the rows of the Hugging Face wikitext datasets.
+    """
+    with open(path, encoding=encoding, newline="") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def corpus_fingerprint(texts):
+    """
+    SHA-256 of a list of texts (length-prefixed, so line boundaries count).
+    """
+    digest = hashlib.sha256()
+    for text in texts:
+        data = text.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer):
+    """
+    SHA-256 of everything that decides a tokenizer's output: the serialized
+    fast tokenizer (vocab, merges, normalizer, pre-tokenizer, post-processor)
+    or, for slow tokenizers, the vocab with added tokens, plus the special
+    tokens map.
+    """
+    digest = hashlib.sha256()
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        digest.update(backend.to_str().encode())
+    else:
+        digest.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode())
+    digest.update(json.dumps(tokenizer.special_tokens_map, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def load_tokenizer(name_or_path):
+    """
+    Loads a tokenizer by Hub name or from a local save_pretrained() directory
+    (no network access needed for the latter, or with HF_HUB_OFFLINE=1 and a
+    populated Hub cache).
+    """
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(name_or_path)
+
+
+class TokenizedCorpus:
+    """
+    Cached tokenization of a corpus: `tokens` is the flat token array
+    (memory-mapped from the cache) and text i is tokens[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.tokens = np.load(os.path.join(directory, "tokens.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def pack(self, block_sizes, batch_size=None):
+        """
+        Blocks for several block sizes straight from the cached arrays (no
+        re-tokenization, no intermediate dataset); see packing.pack().
+        Returns:
+            dict: block_size -> {"input_ids", "attention_mask"} arrays of shape
+            [n_blocks, block_size]. The mask is all ones, as from the tokenizer.
+        """
+        blocks = {}
+        for block_size in block_sizes:
+            input_ids = cut_blocks(self.tokens, self.offsets, block_size, batch_size)
+            blocks[block_size] = {"input_ids": input_ids,
+                                  "attention_mask": np.ones(input_ids.shape, dtype=np.uint8)}
+        return blocks
+
+    def columns(self):
+        """
+        Returns:
+            dict: {"input_ids", "attention_mask"} as lists of lists of ints, the
+            columns dataset.map(tokenize_function, batched=True) produces.
+        """
+        input_ids = [self[i].tolist() for i in range(len(self))]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+
+# Per-worker tokenizer, set once by _init_worker
+_worker_tokenizer = {}
+
+
+def _init_worker(tokenizer):
+    _worker_tokenizer["tokenizer"] = tokenizer
+
+
+def _tokenize_shard(texts, dtype, path):
+    """
+    Tokenizes one shard and writes its tokens and per-text lengths to `path`.
+    """
+    tokenizer = _worker_tokenizer["tokenizer"]
+    input_ids = tokenizer(texts, return_attention_mask=False)["input_ids"] if texts else []
+    tokens, offsets = flatten(input_ids, dtype)
+    with open(f"{path}.tmp", "wb") as f:
+        np.savez(f, tokens=tokens, lengths=np.diff(offsets))
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def tokenize_corpus(texts, tokenizer, cache_dir=CACHE_DIR, workers=None, shard_size=SHARD_SIZE,
+                    force_recompute=False):
+    """
+    Tokenizes a corpus in a process pool, or loads it from the cache.
+    Args:
+        texts (list): The texts, e.g. dataset["text"] or read_lines(path).
+        tokenizer: A tokenizer, or a Hub name / local directory for load_tokenizer().
+        cache_dir (str): Root of the cache; each (corpus, tokenizer) pair gets
+            its own subdirectory.
+        workers (int): Worker processes (default: CPU count); 1 tokenizes in
+            this process.
+        shard_size (int): Texts per shard.
+        force_recompute (bool): Ignore an existing cache entry.
+    Returns:
+        TokenizedCorpus: Tokens and offsets; manifest["cache_hit"] tells whether
+        they came from the cache.
+    """
+    if isinstance(tokenizer, str):
+        name = tokenizer
+        tokenizer = load_tokenizer(tokenizer)
+    else:
+        name = getattr(tokenizer, "name_or_path", type(tokenizer).__name__)
+    texts = list(texts)
+    corpus_sha, tokenizer_sha = corpus_fingerprint(texts), tokenizer_fingerprint(tokenizer)
+    key = hashlib.sha256(f"{FORMAT_VERSION}:{corpus_sha}:{tokenizer_sha}".encode()).hexdigest()[:24]
+    directory = os.path.join(cache_dir, key)
+
+    if force_recompute:
+        shutil.rmtree(directory, ignore_errors=True)
+    if os.path.exists(os.path.join(directory, "manifest.json")):
+        corpus = TokenizedCorpus(directory)
+        corpus.manifest["cache_hit"] = True
+        print(f"[tokenize] cache hit {name} {key[:12]} ({corpus.manifest['n_tokens']:,} tokens)")
+        return corpus
+
+    start = time.perf_counter()
+    # shards of another shard_size (an interrupted run with other settings)
+    # cover other text ranges and are never mixed in
+    shard_dir = os.path.join(directory, f"shards-{shard_size}")
+    os.makedirs(shard_dir, exist_ok=True)
+    dtype = token_dtype(len(tokenizer))
+    shards = [os.path.join(shard_dir, f"shard-{i:05d}.npz") for i in range(0, max(len(texts), 1), shard_size)]
+    # shards finished by an interrupted run are reused
+    todo = [(texts[i * shard_size:(i + 1) * shard_size], dtype, path)
+            for i, path in enumerate(shards) if not os.path.exists(path)]
+    workers = min(workers or os.cpu_count() or 1, max(len(todo), 1))
+    if workers == 1:
+        _init_worker(tokenizer)
+        for args in todo:
+            _tokenize_shard(*args)
+    else:
+        # one process per core: the Rust tokenizer's own thread pool would oversubscribe
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tokenizer,)) as pool:
+            list(pool.map(_tokenize_shard, *zip(*todo)))
+
+    # merge the shards into one flat array without holding them all in memory
+    lengths = []
+    for path in shards:
+        with np.load(path) as shard:
+            lengths.append(shard["lengths"])
+    lengths = np.concatenate(lengths)
+    if len(lengths) != len(texts):
+        raise RuntimeError(f"Shards in {shard_dir} cover {len(lengths)} texts, expected {len(texts)}; "
+                           "rerun with force_recompute=True.")
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    tokens = np.lib.format.open_memmap(os.path.join(directory, "tokens.npy.tmp"), mode="w+",
+                                       dtype=dtype, shape=(int(offsets[-1]),))
+    position = 0
+    for path in shards:
+        with np.load(path) as shard:
+            tokens[position:position + len(shard["tokens"])] = shard["tokens"]
+            position += len(shard["tokens"])
+    tokens.flush()
+    del tokens
+    os.replace(os.path.join(directory, "tokens.npy.tmp"), os.path.join(directory, "tokens.npy"))
+    np.save(os.path.join(directory, "offsets.npy"), offsets)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "key": key,
+        "tokenizer": name,
+        "tokenizer_sha256": tokenizer_sha,
+        "corpus_sha256": corpus_sha,
+        "n_texts": len(texts),
+        "n_tokens": int(offsets[-1]),
+        "dtype": np.dtype(dtype).name,
+        "vocab_size": len(tokenizer),
+        "n_shards": len(shards),
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+    }
+    with open(os.path.join(directory, "manifest.json.tmp"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(os.path.join(directory, "manifest.json.tmp"), os.path.join(directory, "manifest.json"))
+    for path in glob.glob(os.path.join(directory, "shards*")):
+        shutil.rmtree(path)
+
+    corpus = TokenizedCorpus(directory)
+    corpus.manifest["cache_hit"] = False
+    print(f"[tokenize] miss {name} {key[:12]}: {len(texts):,} texts -> {manifest['n_tokens']:,} tokens "
+          f"in {manifest['seconds']:.1f} s ({len(todo)} shards, {workers} workers)")
+    return corpus
@@ -0,0 +1,104 @@
+"""
+Benchmark training-loop overhead of synchronous metric logging against
+MetricsLogger (metrics_logger.py).
+
+A simulated training step (a NumPy matmul) is followed by two log calls
+(train and test metrics of the same step, as xgboost evals produce). Backends:
+    jsonl    local JSON Lines file, flushed on every write
+    remote   a tracking client stand-in that sleeps --latency-ms per call
+             (one call per record when synchronous, one per batch when async)
+Overhead is the loop time minus the no-logging loop time, per step.
+
+Usage (from experiment-tracking-lab/):
+    python benchmarks/bench_metrics_logger.py
+    python benchmarks/bench_metrics_logger.py --steps 5000 --latency-ms 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from metrics_logger import JSONLBackend, MetricsLogger
+
+
+class RemoteBackend:
+    """
+    Stand-in for a network tracking client: every write() call costs `latency` seconds.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.rows = 0
+
+    def write(self, records):
+        time.sleep(self.latency)
+        self.rows += len(records)
+
+    def close(self):
+        pass
+
+
+class SyncLogger:
+    """
+    The notebook's pattern: every log call goes straight to the backend.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def log(self, metrics, step=None):
+        self.backend.write([{"_step": step, "_timestamp": time.time(), **metrics}])
+
+    def close(self):
+        self.backend.close()
+
+
+def train(steps, logger, a, b):
+    start = time.perf_counter()
+    for step in range(steps):
+        loss = float((a @ b).mean())
+        if logger is not None:
+            logger.log({"train-mlogloss": loss, "lr": 0.1}, step=step)
+            logger.log({"test-mlogloss": loss * 1.1, "accuracy": 0.9}, step=step)
+    if logger is not None:
+        logger.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=128, help='Matrix size of the simulated step')
+    parser.add_argument('--latency-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    a, b = rng.random((args.size, args.size)), rng.random((args.size, args.size))
+    root = tempfile.mkdtemp()
+    latency = args.latency_ms / 1e3
+
+    baseline = min(train(args.steps, None, a, b) for _ in range(3))
+    print(f"{args.steps} steps, {baseline / args.steps * 1e6:.0f} µs/step without logging, "
+          f"remote latency {args.latency_ms} ms/call")
+    print(f"{'logger':<16} {'total':>8}  {'overhead/step':>14}  rows")
+    runs = {
+        "sync jsonl": lambda: SyncLogger(JSONLBackend(os.path.join(root, "sync.jsonl"))),
+        "async jsonl": lambda: MetricsLogger(JSONLBackend(os.path.join(root, "async.jsonl"))),
+        "sync remote": lambda: SyncLogger(RemoteBackend(latency)),
+        "async remote": lambda: MetricsLogger(RemoteBackend(latency)),
+    }
+    for name, make in runs.items():
+        logger = make()
+        elapsed = train(args.steps, logger, a, b)
+        backend = logger.backend if isinstance(logger, SyncLogger) else logger.backends[0]
+        rows = backend.rows if isinstance(backend, RemoteBackend) else sum(1 for _ in open(backend.path))
+        print(f"{name:<16} {elapsed:7.2f}s  {(elapsed - baseline) / args.steps * 1e6:11.1f} µs  {rows}")
+
+
+if __name__ == '__main__':
+    main()
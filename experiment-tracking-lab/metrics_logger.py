@@ -0,0 +1,342 @@
+"""
+Asynchronous, buffered metrics logging.
+
+MetricsLogger.log() only puts the record on a bounded in-memory queue; a
+background thread drains it in batches, coalesces records of the same step
+into one row (e.g. train and test loss of one boosting round) and hands each
+batch to one or more backends:
+
+    JSONLBackend    append-only JSON Lines file (one row per step)
+    ParquetBackend  append-only directory of Parquet parts (needs pyarrow)
+    WandbBackend    an active W&B run, so run.log() leaves the training loop
+
+When the queue is full, log() blocks until the writer catches up (or drops
+the record with on_full="drop"). Everything queued is written on flush(),
+close(), leaving a `with` block, or at interpreter exit.
+
+Example:
+    >>> with MetricsLogger(JSONLBackend("metrics/baseline.jsonl")) as logger:
+    ...     model = xgb.train(params, xg_train, evals=[(xg_train, "train")],
+    ...                       callbacks=[xgboost_callback(logger)])
+    ...     logger.log({"accuracy": accuracy})
+"""
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+# Queue capacity (records), longest wait before a partial batch is written
+# (seconds) and largest batch per backend write
+QUEUE_SIZE = int(os.environ.get("METRICS_QUEUE_SIZE", 10_000))
+FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 1.0))
+BATCH_SIZE = int(os.environ.get("METRICS_BATCH_SIZE", 1_000))
+
+# Control markers passed through the queue
+_FLUSH = object()
+_STOP = object()
+
+
+def _to_builtin(value):
+    # NumPy scalars/arrays and anything else JSON does not know
+    if hasattr(value, "item") and getattr(value, "ndim", 0) == 0:
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class JSONLBackend:
+    """
+    Appends one JSON object per row to `path` ("_step" and "_timestamp" plus
+    the metrics). Each batch is written and flushed with a single call.
+    """
+
+    def __init__(self, path, fsync=False):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, records):
+        self._file.write("".join(json.dumps(r, default=_to_builtin) + "\n" for r in records))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetBackend:
+    """
+    Appends rows to a directory of Parquet files (part-00000.parquet, ...),
+    writing a new part every `rows_per_part` rows and on close. Columns are the
+    union of the metric names in each part.
+    """
+
+    def __init__(self, path, rows_per_part=10_000):
+        import pyarrow  # noqa: F401  (fail early when it is missing)
+
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.rows_per_part = rows_per_part
+        self._rows = []
+        self._part = len(glob.glob(os.path.join(path, "part-*.parquet")))
+
+    def write(self, records):
+        self._rows.extend(records)
+        if len(self._rows) >= self.rows_per_part:
+            self._write_part()
+
+    def _write_part(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows:
+            return
+        # union of the keys in first-seen order (from_pylist only uses the first row's)
+        columns = dict.fromkeys(key for row in self._rows for key in row)
+        table = pa.table({key: [_to_builtin(v) if hasattr(v, "item") else v
+                                for v in (row.get(key) for row in self._rows)] for key in columns})
+        path = os.path.join(self.path, f"part-{self._part:05d}.parquet")
+        pq.write_table(table, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        self._rows, self._part = [], self._part + 1
+
+    def close(self):
+        self._write_part()
+
+
+class WandbBackend:
+    """
+    Forwards rows to a W&B run (run.log with the row's step), from the logger's
+    background thread instead of the training loop.
+    """
+
+    def __init__(self, run):
+        self.run = run
+
+    def write(self, records):
+        for record in records:
+            metrics = {k: v for k, v in record.items() if k not in ("_step", "_timestamp")}
+            if record["_step"] is None:
+                self.run.log(metrics)
+            else:
+                self.run.log(metrics, step=record["_step"])
+
+    def close(self):
+        pass
+
+
+def read_metrics(path):
+    """
+    Loads a JSONLBackend file or ParquetBackend directory as a DataFrame.
+    """
+    import pandas as pd
+
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+        return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True) if parts else pd.DataFrame()
+    return pd.read_json(path, lines=True)
+
+
+class MetricsLogger:
+    """
+    Queues metrics in memory and writes them to the backends in batches from a
+    background thread.
+    Args:
+        backends: A backend (write(records) / close()) or a list of them.
+        max_queue (int): Queue capacity in records (backpressure limit).
+        flush_interval (float): Longest time a record waits for its batch.
+        batch_size (int): Largest number of records per backend write.
+        on_full (str): "block" (default) waits for space when the queue is
+            full, "drop" discards the record and counts it in stats["dropped"].
+        coalesce (bool): Merge consecutive records with the same step.
+    """
+
+    def __init__(self, backends, max_queue=QUEUE_SIZE, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE,
+                 on_full="block", coalesce=True):
+        if on_full not in ("block", "drop"):
+            raise ValueError("on_full must be 'block' or 'drop'.")
+        self.backends = list(backends) if isinstance(backends, (list, tuple)) else [backends]
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.on_full = on_full
+        self.coalesce = coalesce
+        self.stats = {"logged": 0, "rows_written": 0, "batches": 0, "dropped": 0, "blocked_s": 0.0}
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="metrics-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, metrics, step=None):
+        """
+        Queues a dict of metrics (scalars) for `step`; returns immediately
+        unless the queue is full.
+        Returns:
+            bool: False if the record was dropped (on_full="drop").
+        """
+        if self._closed:
+            raise RuntimeError("MetricsLogger is closed.")
+        item = (step, time.time(), dict(metrics))
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.on_full == "drop":
+                self.stats["dropped"] += 1
+                return False
+            start = time.perf_counter()
+            self._queue.put(item)
+            self.stats["blocked_s"] += time.perf_counter() - start
+        self.stats["logged"] += 1
+        return True
+
+    def flush(self):
+        """
+        Blocks until every record logged so far has been written.
+        Raises:
+            Exception: The first error a backend raised, if any.
+        """
+        if not self._closed:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """
+        Writes everything still queued, stops the thread and closes the
+        backends. Safe to call twice; also runs at interpreter exit.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(_STOP)
+        self._thread.join()
+        for backend in self.backends:
+            backend.close()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while items[-1] not in (_FLUSH, _STOP) and len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            self._write([item for item in items if item is not _FLUSH and item is not _STOP])
+            for _ in items:
+                self._queue.task_done()
+            if items[-1] is _STOP:
+                return
+
+    def _write(self, items):
+        if not items:
+            return
+        records = []
+        for step, timestamp, metrics in items:
+            if self.coalesce and step is not None and records and records[-1]["_step"] == step:
+                records[-1].update(metrics)
+                records[-1]["_timestamp"] = timestamp
+            else:
+                records.append({"_step": step, "_timestamp": timestamp, **metrics})
+        for backend in self.backends:
+            try:
+                backend.write(records)
+            except Exception as e:
+                # keep draining so training never blocks on a broken backend
+                print(f"[metrics] {type(backend).__name__} failed: {e}")
+                self.error = self.error or e
+        self.stats["rows_written"] += len(records)
+        self.stats["batches"] += 1
+
+
+def xgboost_callback(logger, log_feature_importance=True, importance_type="gain", define_metric=True):
+    """
+    XGBoost training callback that logs every round's evaluation metrics
+    ("train-mlogloss", "test-mlogloss", ... as named by wandb's WandbCallback)
+    through `logger`, with the round as step.
+
+    If one of the logger's backends is a WandbBackend, the callback also does
+    what WandbCallback does once per training on that run: the booster config
+    goes into run.config, define_metric keeps the best value of each metric in
+    the run summary, and after training (once the logger is flushed, so steps
+    stay in order) the feature importance bar chart and, with early stopping,
+    best_score / best_iteration are logged.
+    Args:
+        logger (MetricsLogger): Where the per-round metrics go.
+        log_feature_importance (bool): Log the "Feature Importance" chart.
+        importance_type (str): Booster.get_score importance type.
+        define_metric (bool): Summarize metrics by their best value.
+    """
+    import xgboost as xgb
+
+    run = next((b.run for b in logger.backends if isinstance(b, WandbBackend)), None)
+
+    class MetricsCallback(xgb.callback.TrainingCallback):
+        def __init__(self):
+            super().__init__()
+            self.defined = not define_metric
+
+        def before_training(self, model):
+            if run is not None:
+                run.config.update(json.loads(model.save_config()))
+            return model
+
+        def after_iteration(self, model, epoch, evals_log):
+            metrics = {f"{data}-{metric}": values[-1]
+                       for data, metrics in evals_log.items() for metric, values in metrics.items()}
+            if run is not None and not self.defined:
+                _define_best_metrics(run, metrics)
+                self.defined = True
+            logger.log(metrics, step=epoch)
+            return False
+
+        def after_training(self, model):
+            if run is None:
+                return model
+            logger.flush()
+            if log_feature_importance:
+                import wandb
+
+                importance = model.get_score(importance_type=importance_type)
+                table = wandb.Table(data=[[k, v] for k, v in importance.items()], columns=["Feature", "Importance"])
+                run.log({"Feature Importance": wandb.plot.bar(table, "Feature", "Importance",
+                                                              title="Feature Importance")})
+            if model.attr("best_score") is not None:
+                run.log({"best_score": float(model.attr("best_score")),
+                         "best_iteration": int(model.attr("best_iteration"))})
+            return model
+
+    return MetricsCallback()
+
+
+def _define_best_metrics(run, metrics):
+    # Same rules as WandbCallback: losses and error metrics keep their
+    # minimum in the run summary, scores their maximum
+    from wandb.integration.xgboost.xgboost import MAXIMIZE_METRICS, MINIMIZE_METRICS
+
+    for name in metrics:
+        metric = name.split("-", 1)[1].lower()
+        if "loss" in metric or metric in MINIMIZE_METRICS:
+            run.define_metric(name, summary="min")
+        elif metric in MAXIMIZE_METRICS:
+            run.define_metric(name, summary="max")
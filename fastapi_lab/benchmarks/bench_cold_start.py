@@ -0,0 +1,59 @@
+"""
+Measure worker cold start for each model artifact format: interpreter start,
+importing predict.py, loading the artifact and serving the first prediction.
+Each format runs in fresh processes so nothing is already imported or cached.
+
+Usage (from fastapi_lab/):
+    python benchmarks/bench_cold_start.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+CHILD = """
+import sys, time, json
+t0 = time.perf_counter()
+import predict
+t1 = time.perf_counter()
+predict.registry.current()
+t2 = time.perf_counter()
+predict.predict_batch([[5.1, 3.5, 1.4, 0.2]])
+t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "load_ms": (t2 - t1) * 1e3,
+                  "first_predict_ms": (t3 - t2) * 1e3, "sklearn_imported": "sklearn" in sys.modules}))
+"""
+
+
+def run_once(model_format):
+    env = dict(os.environ, IRIS_MODEL_FORMAT=model_format)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=SRC_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1e3
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'format':>8} {'import (ms)':>12} {'load (ms)':>10} {'1st predict (ms)':>17} "
+          f"{'process total (ms)':>19} {'sklearn imported':>17}")
+    for model_format in ("pickle", "npz"):
+        runs = [run_once(model_format) for _ in range(args.runs)]
+        med = {key: statistics.median(r[key] for r in runs)
+               for key in ("import_ms", "load_ms", "first_predict_ms", "process_ms")}
+        print(f"{model_format:>8} {med['import_ms']:12.1f} {med['load_ms']:10.1f} {med['first_predict_ms']:17.2f} "
+              f"{med['process_ms']:19.1f} {str(runs[0]['sklearn_imported']):>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark the compiled NumPy tree against sklearn's predict/predict_proba.
+
+The served Iris tree (at most 8 splits for every max_depth in the training
+search space) is evaluated through the leaf lookup table. Larger trees, fitted
+here on synthetic 4-feature data, are walked level by level; the second table
+shows where sklearn's Cython traversal overtakes them.
+
+Usage (from fastapi_lab/):
+    python benchmarks/bench_compiled_tree.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from sklearn.tree import DecisionTreeClassifier  # noqa: E402
+
+from predict import CompiledTree, get_model  # noqa: E402
+
+BATCH_SIZES = [1, 100, 100_000]
+LARGE_TREE_DEPTHS = [4, 6, 10]
+
+
+def make_batch(n, seed=0):
+    """
+    Random rows spanning the Iris feature ranges.
+    """
+    rng = np.random.default_rng(seed)
+    low = np.array([4.3, 2.0, 1.0, 0.1])
+    high = np.array([7.9, 4.4, 6.9, 2.5])
+    return rng.uniform(low, high, size=(n, 4))
+
+
+def best_time(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def speedup(model, compiled, X):
+    """
+    Check that both give identical results, then time predict_proba.
+    Returns:
+        (sklearn seconds, compiled seconds)
+    """
+    assert np.array_equal(model.predict(X), compiled.predict(X))
+    assert np.array_equal(model.predict_proba(X), compiled.predict_proba(X))
+    number = max(1, 20_000 // len(X))
+    return best_time(lambda: model.predict_proba(X), number), best_time(lambda: compiled.predict_proba(X), number)
+
+
+def main():
+    model = get_model()
+    compiled = CompiledTree.from_sklearn(model)
+
+    print(f"Iris model ({len(compiled._splits)} splits, leaf lookup table)")
+    print(f"{'batch':>8} {'sklearn (us)':>14} {'compiled (us)':>14} {'speedup':>8}")
+    for n in BATCH_SIZES:
+        t_sklearn, t_compiled = speedup(model, compiled, make_batch(n))
+        print(f"{n:>8} {t_sklearn * 1e6:>14.1f} {t_compiled * 1e6:>14.1f} {t_sklearn / t_compiled:>7.1f}x")
+
+    rng = np.random.default_rng(0)
+    X_train = rng.normal(size=(3000, 4))
+    y_train = (X_train[:, 0] + X_train[:, 1] ** 2 + rng.normal(size=3000) > 0.5).astype(int) + (X_train[:, 2] > 1)
+    X = rng.normal(size=(max(BATCH_SIZES), 4))
+    print("\nLarger trees (synthetic data), speedup of compiled over sklearn")
+    print(f"{'depth':>5} {'splits':>7} {'mode':>7} " + " ".join(f"{n:>8}" for n in BATCH_SIZES))
+    for depth in LARGE_TREE_DEPTHS:
+        model = DecisionTreeClassifier(max_depth=depth, random_state=0).fit(X_train, y_train)
+        compiled = CompiledTree.from_sklearn(model)
+        mode = "lookup" if compiled._leaf_table is not None else "walk"
+        ratios = [t_sklearn / t_compiled for t_sklearn, t_compiled in (speedup(model, compiled, X[:n]) for n in BATCH_SIZES)]
+        print(f"{depth:>5} {len(compiled._splits):>7} {mode:>7} " + " ".join(f"{r:>7.1f}x" for r in ratios))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Load-test and micro-benchmark harness for the Iris API.
+
+Starts the app in-process on a local uvicorn server, drives /predict and
+/predict/batch with a configurable concurrency and request mix, and
+micro-benchmarks predict_data / predict_proba on their own. Results are
+written as JSON so runs from different commits can be compared.
+
+Usage (from fastapi_lab/):
+    python benchmarks/bench_service.py --concurrency 32 --requests 5000 \\
+        --mix predict=0.9,batch=0.1 --output bench.json
+    python benchmarks/bench_service.py --compare bench.json   # fail on regressions
+
+Server features are configured the usual way, e.g. IRIS_MICROBATCH=1 or
+IRIS_INFERENCE_MODE=compiled in the environment.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+import timeit
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+import main  # noqa: E402
+from predict import predict_data, predict_proba  # noqa: E402
+
+FEATURE_LOW = np.array([4.3, 2.0, 1.0, 0.1])
+FEATURE_HIGH = np.array([7.9, 4.4, 6.9, 2.5])
+MICRO_BATCH_SIZES = [1, 100, 10_000]
+ENV_KEYS = ["IRIS_INFERENCE_MODE", "IRIS_MICROBATCH", "IRIS_MICROBATCH_WAIT_MS",
+            "IRIS_MICROBATCH_MAX_ROWS", "IRIS_CACHE_SIZE", "IRIS_METRICS"]
+
+
+def parse_mix(text):
+    """
+    "predict=0.9,batch=0.1" -> {"predict": 0.9, "batch": 0.1}
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("predict", "batch"):
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def random_rows(rng, n):
+    return rng.uniform(FEATURE_LOW, FEATURE_HIGH, size=(n, 4)).round(1)
+
+
+def make_request(kind, rng, batch_rows):
+    if kind == "predict":
+        row = random_rows(rng, 1)[0]
+        return "/predict", dict(zip(main.FEATURES, row.tolist()))
+    rows = random_rows(rng, batch_rows)
+    return "/predict/batch", {"columns": {f: rows[:, i].tolist() for i, f in enumerate(main.FEATURES)}}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def summarize(latencies):
+    if not latencies:
+        return {"count": 0}
+    ms = np.asarray(latencies) * 1000.0
+    return {
+        "count": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+async def drive(base_url, n_requests, concurrency, mix, batch_rows, seed):
+    rng = np.random.default_rng(seed)
+    picker = random.Random(seed)
+    kinds, weights = zip(*mix.items())
+    plan = [make_request(k, rng, batch_rows) for k in picker.choices(kinds, weights, k=n_requests)]
+    latencies = {"/predict": [], "/predict/batch": []}
+    errors = 0
+    next_index = 0
+
+    async def worker(client):
+        nonlocal next_index, errors
+        while next_index < len(plan):
+            path, body = plan[next_index]
+            next_index += 1
+            start = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies[path].append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        # Warm-up so connection setup and first-call costs stay out of the numbers
+        for path, body in plan[:min(20, len(plan))]:
+            await client.post(path, json=body)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def run_service_benchmark(args):
+    port = free_port()
+    server, thread = start_server(port)
+    try:
+        cpu_start = time.process_time()
+        latencies, errors, elapsed = asyncio.run(drive(
+            f"http://127.0.0.1:{port}", args.requests, args.concurrency,
+            parse_mix(args.mix), args.batch_rows, args.seed))
+        cpu = time.process_time() - cpu_start
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    total = sum(len(v) for v in latencies.values())
+    rows = len(latencies["/predict"]) + len(latencies["/predict/batch"]) * args.batch_rows
+    return {
+        "concurrency": args.concurrency,
+        "requests": total,
+        "mix": args.mix,
+        "batch_rows": args.batch_rows,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": total / elapsed,
+        "rows_per_s": rows / elapsed,
+        "cpu_s": cpu,
+        "cpu_utilization": cpu / elapsed,
+        "rss_mb": current_rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+        "latency": {path: summarize(v) for path, v in latencies.items() if v},
+    }
+
+
+def run_micro_benchmark(seed):
+    rng = np.random.default_rng(seed)
+    results = {}
+    for n in MICRO_BATCH_SIZES:
+        X = random_rows(rng, n)
+        number = max(1, 20_000 // n)
+        for name, fn in (("predict_data", predict_data), ("predict_proba", predict_proba)):
+            best = min(timeit.repeat(lambda: fn(X), number=number, repeat=5)) / number
+            results[f"{name}[{n}]"] = {"us_per_call": best * 1e6, "us_per_row": best * 1e6 / n}
+    return results
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=os.path.dirname(__file__), check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, tolerance):
+    """
+    Return human-readable regressions of `current` against `baseline`.
+    """
+    regressions = []
+    cur, base = current.get("service"), baseline.get("service")
+    if cur and base:
+        if cur["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"throughput {cur['throughput_rps']:.0f} < {base['throughput_rps']:.0f} req/s")
+        for path, stats in cur["latency"].items():
+            old = base["latency"].get(path)
+            if old and stats["p99_ms"] > old["p99_ms"] * (1 + tolerance):
+                regressions.append(f"{path} p99 {stats['p99_ms']:.2f} > {old['p99_ms']:.2f} ms")
+    for name, stats in current.get("micro", {}).items():
+        old = baseline.get("micro", {}).get(name)
+        if old and stats["us_per_call"] > old["us_per_call"] * (1 + tolerance):
+            regressions.append(f"{name} {stats['us_per_call']:.1f} > {old['us_per_call']:.1f} us/call")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--mix", default="predict=0.9,batch=0.1")
+    parser.add_argument("--batch-rows", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-service", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "env": {k: os.environ[k] for k in ENV_KEYS if k in os.environ},
+        }
+    }
+    if not args.skip_service:
+        results["service"] = run_service_benchmark(args)
+    if not args.skip_micro:
+        results["micro"] = run_micro_benchmark(args.seed)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,172 @@
+import asyncio
+import time
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching queue for single-row predictions.
+
+    Requests that arrive within `max_wait_ms` of each other (or until
+    `max_batch_size` rows are queued) are stacked into one matrix and scored
+    with a single call to `predict_fn` in a worker thread, so the event loop
+    never blocks on the model. Each caller gets its own row back through an
+    asyncio future.
+    """
+
+    def __init__(self, predict_fn, max_wait_ms=2.0, max_batch_size=64, on_batch=None):
+        """
+        Args:
+            predict_fn (callable): Takes an (n, 4) matrix and returns
+                (class_ids, probabilities), e.g. predict.predict_batch. Any
+                further values it returns (such as the model version) describe
+                the whole batch and are appended to every caller's result.
+            max_wait_ms (float): How long the first queued request waits for
+                company before its batch is dispatched.
+            max_batch_size (int): Dispatch immediately once this many rows are queued.
+            on_batch (callable): Optional hook called with the size of every dispatched batch.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.predict_fn = predict_fn
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.max_batch_size = max_batch_size
+        self.on_batch = on_batch
+        self._queue = None
+        self._full = None
+        self._task = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_seen = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.batch_size_buckets = {}
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """
+        Start the background dispatcher on the running event loop.
+        """
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the dispatcher and fail any request still waiting in the queue.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self._queue.empty():
+            _, fut, _ = self._queue.get_nowait()
+            self._fail([fut], RuntimeError("Micro-batcher stopped."))
+
+    async def submit(self, row):
+        """
+        Queue one feature row and wait for its prediction.
+        Args:
+            row (list[float]): The four measurements in training column order.
+        Returns:
+            (class_id, probabilities) for this row, followed by any batch-level
+            values predict_fn returned.
+        """
+        if not self.running:
+            raise RuntimeError("Micro-batcher is not running.")
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, fut, time.perf_counter()))
+        # _run already holds the batch's first row, so the queue only has to
+        # reach max_batch_size - 1 (the same check _run makes before waiting)
+        if self._queue.qsize() >= self.max_batch_size - 1:
+            self._full.set()
+        return await fut
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                # Give concurrent requests a short window to join this batch
+                if self.max_wait > 0 and self._queue.qsize() < self.max_batch_size - 1:
+                    self._full.clear()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.max_wait)
+                    except asyncio.TimeoutError:
+                        pass
+
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                await self._dispatch(batch)
+            except BaseException:
+                # Cancelled by stop() mid-batch: these rows are no longer in the
+                # queue, so fail them here or their callers wait forever
+                self._fail([fut for _, fut, _ in batch], RuntimeError("Micro-batcher stopped."))
+                raise
+
+    async def _dispatch(self, batch):
+        now = time.perf_counter()
+        rows = [row for row, _, _ in batch]
+        futures = [fut for _, fut, _ in batch]
+        waits = [now - queued_at for _, _, queued_at in batch]
+        self._record(len(batch), waits)
+
+        try:
+            X = np.asarray(rows, dtype=np.float64)
+            class_ids, proba, *extra = await asyncio.to_thread(self.predict_fn, X)
+        except Exception as e:
+            self._fail(futures, e)
+            return
+
+        for i, fut in enumerate(futures):
+            # The client may have gone away while we were scoring
+            if not fut.done():
+                fut.set_result((class_ids[i], proba[i], *extra))
+
+    @staticmethod
+    def _fail(futures, error):
+        for fut in futures:
+            if not fut.done():
+                fut.set_exception(error)
+
+    def _record(self, size, waits):
+        self.batches += 1
+        self.rows += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self.total_queue_wait += sum(waits)
+        self.max_queue_wait = max(self.max_queue_wait, max(waits))
+        # Power-of-two buckets: "1", "2", "4", ... upper bounds on the batch size
+        bucket = str(1 << (size - 1).bit_length())
+        self.batch_size_buckets[bucket] = self.batch_size_buckets.get(bucket, 0) + 1
+        if self.on_batch is not None:
+            self.on_batch(size)
+
+    def stats(self):
+        """
+        Batch-size and queue-wait statistics since startup.
+        """
+        return {
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "max_batch_seen": self.max_batch_seen,
+            "batch_size_buckets": dict(sorted(self.batch_size_buckets.items(), key=lambda kv: int(kv[0]))),
+            "mean_queue_wait_ms": 1000.0 * self.total_queue_wait / self.rows if self.rows else 0.0,
+            "max_queue_wait_ms": 1000.0 * self.max_queue_wait,
+        }
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    In-process LRU/TTL cache of single-row predictions.
+
+    Keys are the feature tuple rounded to `precision` decimals, so repeated
+    sensor readings reported at fixed precision hit the same entry. The cache
+    is tied to one model version and empties itself as soon as a lookup or
+    insert arrives for a different version.
+    """
+
+    def __init__(self, max_entries=10_000, precision=2, ttl_seconds=0.0):
+        """
+        Args:
+            max_entries (int): Upper bound on cached rows (least recently used evicted first).
+            precision (int): Decimals kept when building the key.
+            ttl_seconds (float): Entry lifetime; 0 keeps entries until evicted.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.precision = precision
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def key(self, row):
+        return tuple(round(float(v), self.precision) for v in row)
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, row, version):
+        """
+        Cached value for `row` under model `version`, or None.
+        """
+        key = self.key(row)
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, row, version, value):
+        key = self.key(row)
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "model_version": self._version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "precision": self.precision,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -1,11 +1,74 @@
+import os
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Optional
+
+import numpy as np
 from fastapi import FastAPI, status, HTTPException
-from pydantic import BaseModel
-from predict import predict_data, predict_proba, get_model
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, model_validator
+from predict import predict_batch, registry, training_metadata
+from batching import MicroBatcher
+from cache import PredictionCache
+from metrics import MetricsMiddleware, ServiceMetrics, inference_phase
+from registry import ModelWatcher
+
+# Opt-in Prometheus-style metrics; when off the middleware is not installed at all
+METRICS_ENABLED = os.environ.get("IRIS_METRICS", "0") == "1"
+metrics = ServiceMetrics() if METRICS_ENABLED else None
+
+def observe_batch_size(source):
+    if metrics is None:
+        return None
+    return lambda size: metrics.batch_size.observe(size, source)
+
+# Opt-in micro-batching of concurrent /predict calls
+MICROBATCH_ENABLED = os.environ.get("IRIS_MICROBATCH", "0") == "1"
+batcher = MicroBatcher(
+    partial(predict_batch, return_version=True),
+    max_wait_ms=float(os.environ.get("IRIS_MICROBATCH_WAIT_MS", "2")),
+    max_batch_size=int(os.environ.get("IRIS_MICROBATCH_MAX_ROWS", "64")),
+    on_batch=observe_batch_size("microbatch"),
+) if MICROBATCH_ENABLED else None
+observe_endpoint_batch = observe_batch_size("batch_endpoint")
+
+# Optional result cache for repeated rows (IRIS_CACHE_SIZE=0 disables it)
+CACHE_SIZE = int(os.environ.get("IRIS_CACHE_SIZE", "0"))
+cache = PredictionCache(
+    max_entries=CACHE_SIZE,
+    precision=int(os.environ.get("IRIS_CACHE_PRECISION", "2")),
+    ttl_seconds=float(os.environ.get("IRIS_CACHE_TTL", "0")),
+) if CACHE_SIZE > 0 else None
+
+# Poll the model file every N seconds and hot-reload it on change (0 = off)
+MODEL_WATCH_SECS = float(os.environ.get("IRIS_MODEL_WATCH_SECS", "0"))
+watcher = ModelWatcher(registry, MODEL_WATCH_SECS) if MODEL_WATCH_SECS > 0 else None
 
-app = FastAPI(title="Iris Classifier API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app):
+    # Load and warm up the model before accepting traffic
+    await run_in_threadpool(registry.current)
+    if watcher is not None:
+        watcher.start()
+    if batcher is not None:
+        await batcher.start()
+    yield
+    if batcher is not None:
+        await batcher.stop()
+    if watcher is not None:
+        watcher.stop()
+
+app = FastAPI(title="Iris Classifier API", version="1.0.0", lifespan=lifespan)
+if metrics is not None:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 # Class mapping for Iris dataset
 SPECIES = {0: "setosa", 1: "versicolor", 2: "virginica"}
+SPECIES_NAMES = np.array([SPECIES[i] for i in sorted(SPECIES)])
+
+# Column order the model was trained on
+FEATURES = ("sepal_length", "sepal_width", "petal_length", "petal_width")
 
 class IrisData(BaseModel):
     """
@@ -16,6 +79,53 @@ class IrisData(BaseModel):
     petal_length: float
     petal_width: float
 
+class IrisColumns(BaseModel):
+    """
+    Columnar batch payload: one list per measurement, all of the same length.
+    """
+    sepal_length: list[float]
+    sepal_width: list[float]
+    petal_length: list[float]
+    petal_width: list[float]
+
+class IrisBatchData(BaseModel):
+    """
+    Request body schema for /predict/batch.
+    Send either `instances` (a list of rows) or `columns` (one list per feature).
+    """
+    instances: Optional[list[IrisData]] = None
+    columns: Optional[IrisColumns] = None
+
+    @model_validator(mode="after")
+    def check_payload(self):
+        if (self.instances is None) == (self.columns is None):
+            raise ValueError("Provide exactly one of 'instances' or 'columns'.")
+        if self.columns is not None:
+            lengths = {len(getattr(self.columns, f)) for f in FEATURES}
+            if len(lengths) != 1:
+                raise ValueError("All columns must have the same length.")
+        if self.num_rows() == 0:
+            raise ValueError("Batch cannot be empty.")
+        return self
+
+    def num_rows(self):
+        if self.instances is not None:
+            return len(self.instances)
+        return len(self.columns.sepal_length)
+
+    def to_matrix(self):
+        """
+        Build a single (n_rows, 4) float64 matrix in training column order.
+        """
+        if self.instances is not None:
+            return np.array(
+                [[getattr(row, f) for f in FEATURES] for row in self.instances],
+                dtype=np.float64,
+            )
+        return np.column_stack([
+            np.asarray(getattr(self.columns, f), dtype=np.float64) for f in FEATURES
+        ])
+
 class IrisResponse(BaseModel):
     """
     Response schema returned by /predict.
@@ -25,6 +135,16 @@ class IrisResponse(BaseModel):
     probabilities: list[float]
     confidence: float
 
+class IrisBatchResponse(BaseModel):
+    """
+    Response schema returned by /predict/batch (columnar, one entry per row).
+    """
+    count: int
+    class_ids: list[int]
+    species: list[str]
+    probabilities: list[list[float]]
+    confidence: list[float]
+
 @app.get("/", status_code=status.HTTP_200_OK)
 async def health_ping():
     """
@@ -35,14 +155,67 @@ async def health_ping():
 @app.get("/model-info")
 async def model_info():
     """
-    Returns model metadata and hyperparameters.
+    Returns model metadata, hyperparameters and the active version.
     """
-    model = get_model()
+    active = registry.current()
     return {
-        "model_type": type(model).__name__,
-        "params": model.get_params()
+        "model_type": getattr(active.model, "model_type", type(active.model).__name__),
+        "params": active.model.get_params(),
+        "training": training_metadata(active.version),
+        **registry.info()
     }
 
+@app.post("/admin/reload")
+async def reload_model():
+    """
+    Load the model file in the background and swap it in atomically.
+    In-flight requests finish on the previous version.
+    """
+    try:
+        changed = await run_in_threadpool(registry.reload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, keeping current version: {e}")
+    return {"reloaded": changed, **registry.info()}
+
+@app.post("/admin/activate/{version}")
+async def activate_model(version: str):
+    """
+    Roll back (or forward) to a model version still held in memory.
+    """
+    try:
+        registry.activate(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return registry.info()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Prometheus text exposition of request counts, phase latencies,
+    batch sizes and in-flight requests.
+    """
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled. Set IRIS_METRICS=1.")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/batching-stats")
+async def batching_stats():
+    """
+    Returns micro-batching batch-size and queue-wait statistics.
+    """
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """
+    Returns prediction cache hit/miss/eviction counters.
+    """
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
 @app.post("/predict", response_model=IrisResponse)
 async def predict_iris(iris_features: IrisData):
     """
@@ -56,8 +229,25 @@ async def predict_iris(iris_features: IrisData):
             iris_features.petal_width
         ]]
 
-        pred = int(predict_data(X)[0])
-        probs = predict_proba(X)[0].tolist()
+        with inference_phase():
+            cached = None
+            if cache is not None:
+                cached = cache.get(X[0], registry.current().version)
+
+            if cached is not None:
+                class_id, row_proba = cached
+            else:
+                # Key the cache with the version that actually scored the row;
+                # a hot reload may land between the lookup and inference
+                if batcher is not None:
+                    class_id, row_proba, version = await batcher.submit(X[0])
+                else:
+                    class_ids, proba, version = predict_batch(X, return_version=True)
+                    class_id, row_proba = class_ids[0], proba[0]
+                if cache is not None:
+                    cache.put(X[0], version, (class_id, row_proba.copy()))
+        pred = int(class_id)
+        probs = row_proba.tolist()
         conf = float(max(probs))
 
         return IrisResponse(
@@ -68,4 +258,27 @@ async def predict_iris(iris_features: IrisData):
         )
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/batch", response_model=IrisBatchResponse)
+async def predict_iris_batch(batch: IrisBatchData):
+    """
+    Predict species for many rows with one vectorized model call.
+    """
+    try:
+        X = batch.to_matrix()
+        if observe_endpoint_batch is not None:
+            observe_endpoint_batch(len(X))
+        with inference_phase():
+            class_ids, proba = await run_in_threadpool(predict_batch, X)
+
+        return IrisBatchResponse(
+            count=len(class_ids),
+            class_ids=class_ids.tolist(),
+            species=SPECIES_NAMES[class_ids].tolist(),
+            probabilities=proba.tolist(),
+            confidence=proba.max(axis=1).tolist()
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,197 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = tuple(2 ** i for i in range(17))  # 1 .. 65536
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            # per-bucket counts (last slot is +Inf), sum, count
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                le = _format_labels(self.labelnames, labels, ("le", bound))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            base = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {total}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class ServiceMetrics:
+    """
+    Prometheus-style metrics for the Iris API, rendered in the text exposition format.
+    All updates happen on the event loop thread.
+    """
+
+    def __init__(self):
+        self.requests = Counter(
+            "iris_requests_total", "HTTP requests by endpoint, method and status.",
+            ("endpoint", "method", "status"))
+        self.latency = Histogram(
+            "iris_request_duration_seconds",
+            "Request latency split into validation, inference, serialization and total.",
+            ("endpoint", "phase"))
+        self.batch_size = Histogram(
+            "iris_batch_size", "Rows scored per model call.",
+            ("source",), buckets=BATCH_SIZE_BUCKETS)
+        self.in_flight = Gauge("iris_requests_in_flight", "Requests currently being handled.")
+
+    def render(self):
+        lines = []
+        for metric in (self.requests, self.latency, self.batch_size, self.in_flight):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RequestTimer:
+    """
+    Phase timestamps for one request. The middleware stamps the start and the
+    moment the response starts; handlers wrap model work in `phase()`.
+    """
+
+    __slots__ = ("start", "inference_start", "inference_end", "response_start")
+
+    def __init__(self, start):
+        self.start = start
+        self.inference_start = None
+        self.inference_end = None
+        self.response_start = None
+
+    def __enter__(self):
+        self.inference_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.inference_end = time.perf_counter()
+        return False
+
+
+class _NoopPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopPhase()
+_current_timer = ContextVar("iris_request_timer", default=None)
+
+
+def inference_phase():
+    """
+    Context manager marking the model-inference phase of the current request.
+    A shared no-op when metrics are disabled.
+    """
+    timer = _current_timer.get()
+    return _NOOP if timer is None else timer
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: counts requests, tracks in-flight load and records
+    per-phase latency. Not installed at all when metrics are disabled.
+
+    Phases: validation = request start to inference start (routing, body
+    parsing, pydantic), inference = the handler's inference_phase() block,
+    serialization = inference end to the first response byte.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer(time.perf_counter())
+        token = _current_timer.set(timer)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                timer.response_start = time.perf_counter()
+                status_code = message["status"]
+            await send(message)
+
+        self.metrics.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end = time.perf_counter()
+            self.metrics.in_flight.dec()
+            _current_timer.reset(token)
+            self._record(scope, timer, end, status_code)
+
+    def _record(self, scope, timer, end, status_code):
+        route = scope.get("route")
+        endpoint = getattr(route, "path", "unmatched")
+        m = self.metrics
+        m.requests.inc(endpoint, scope["method"], status_code)
+        m.latency.observe(end - timer.start, endpoint, "total")
+        if timer.inference_start is not None and timer.inference_end is not None:
+            m.latency.observe(timer.inference_start - timer.start, endpoint, "validation")
+            m.latency.observe(timer.inference_end - timer.inference_start, endpoint, "inference")
+            if timer.response_start is not None:
+                m.latency.observe(timer.response_start - timer.inference_end, endpoint, "serialization")
@@ -1,18 +1,309 @@
-import joblib
-from functools import lru_cache
+import os
+import json
+import numpy as np
 from pathlib import Path
 
-MODEL_PATH = Path(__file__).resolve().parent.parent / "model" / "iris_model.pkl"
+from registry import ModelRegistry
+
+PICKLE_PATH = Path(__file__).resolve().parent.parent / "model" / "iris_model.pkl"
+# Compact export written by train.py: flat arrays in one .npz, no pickle
+COMPACT_PATH = PICKLE_PATH.with_suffix(".npz")
+COMPACT_FORMAT_VERSION = 1
+
+# "pickle" (default) serves the joblib/sklearn artifact, "npz" the compact one,
+# which loads without importing scikit-learn or joblib
+MODEL_FORMAT = os.environ.get("IRIS_MODEL_FORMAT", "pickle")
+MODEL_PATH = COMPACT_PATH if MODEL_FORMAT == "npz" else PICKLE_PATH
+
+# "sklearn" (default) or "compiled" (flat NumPy tree, no sklearn on the hot path)
+INFERENCE_MODE = os.environ.get("IRIS_INFERENCE_MODE", "sklearn")
+
+# Memory-map the NumPy arrays stored in the joblib artifact (read-only, shared
+# through the page cache between worker processes)
+MODEL_MMAP = os.environ.get("IRIS_MODEL_MMAP", "0") == "1"
+
+# Trees with at most this many split nodes are evaluated through a leaf lookup
+# table (2 ** splits entries) instead of walking them level by level
+LOOKUP_MAX_SPLITS = 12
+
+
+def float32_thresholds(threshold):
+    """
+    Round thresholds to float32 towards -inf: for any float32 x, x > t32
+    exactly when x > t64, so float32 inputs are routed as by sklearn.
+    """
+    threshold32 = np.asarray(threshold).astype(np.float32)
+    too_high = threshold32.astype(np.float64) > threshold
+    threshold32[too_high] = np.nextafter(threshold32[too_high], np.float32(-np.inf))
+    return threshold32
+
+
+class CompiledTree:
+    """
+    Structure-of-arrays copy of a fitted DecisionTreeClassifier.
+
+    Small trees (up to LOOKUP_MAX_SPLITS split nodes) are evaluated by
+    comparing one feature column per split and packing the outcomes into a
+    bit code per row; a table built once maps every code to its leaf. Larger
+    trees are walked one level per step with vectorized NumPy indexing, so a
+    depth-d tree costs d array operations no matter how many rows are scored.
+    Leaves point back to themselves, which lets all rows take exactly
+    max_depth steps without masking.
+    """
+
+    def __init__(self, feature, threshold, children_left, children_right,
+                 missing_go_to_left, proba, classes, max_depth, n_features,
+                 params=None, model_type="CompiledTree"):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.missing_go_to_left = missing_go_to_left
+        self.proba = proba
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+        self.params = params or {}
+        self.model_type = model_type
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self._children = np.stack([children_left, children_right], axis=1).ravel()
+        # Comparing float32 with float32 avoids upcasting every input column
+        self._threshold32 = float32_thresholds(threshold)
+        self._splits = np.flatnonzero(children_left != np.arange(len(children_left)))
+        self._leaf_table = self._build_leaf_table() if len(self._splits) <= LOOKUP_MAX_SPLITS else None
+
+    def _build_leaf_table(self):
+        # Walk every possible code (bit i = row goes right at split i) to its leaf
+        codes = np.arange(2 ** len(self._splits))
+        bit = np.zeros(len(self.feature), dtype=np.intp)
+        bit[self._splits] = np.arange(len(self._splits))
+        is_split = np.zeros(len(self.feature), dtype=bool)
+        is_split[self._splits] = True
+        node = np.zeros(len(codes), dtype=np.intp)
+        for _ in range(self.max_depth):
+            go_right = ((codes >> bit[node]) & 1).astype(bool) & is_split[node]
+            node = np.take(self._children, 2 * node + go_right)
+        return node
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Export the arrays of a fitted single-output DecisionTreeClassifier.
+        """
+        tree = getattr(model, "tree_", None)
+        if tree is None or not hasattr(model, "classes_") or model.n_outputs_ != 1:
+            raise TypeError("Only fitted single-output DecisionTreeClassifier models can be compiled.")
+
+        nodes = np.arange(tree.node_count, dtype=np.intp)
+        is_leaf = tree.children_left == -1
+        left = np.where(is_leaf, nodes, tree.children_left).astype(np.intp)
+        right = np.where(is_leaf, nodes, tree.children_right).astype(np.intp)
+        feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+        threshold = np.where(is_leaf, np.inf, tree.threshold).astype(np.float64)
+        missing_left = np.asarray(
+            getattr(tree, "missing_go_to_left", np.zeros(tree.node_count)), dtype=bool
+        )
+
+        # scikit-learn >= 1.4 stores class fractions and returns them as is;
+        # older versions store weighted counts and normalise in predict_proba
+        value = tree.value[:, 0, :model.n_classes_]
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        if np.allclose(normalizer, 1.0):
+            proba = value.copy()
+        else:
+            normalizer[normalizer == 0.0] = 1.0
+            proba = value / normalizer
+
+        return cls(feature, threshold, left, right, missing_left, proba,
+                   np.asarray(model.classes_), int(tree.max_depth), int(model.n_features_in_),
+                   params=model.get_params(), model_type=type(model).__name__)
+
+    def get_params(self):
+        """
+        Hyperparameters of the exported estimator (sklearn-style).
+        """
+        return dict(self.params)
+
+    def save(self, path):
+        """
+        Write the tree as flat arrays in one uncompressed .npz (no pickle).
+
+        Thresholds are stored as float32 rounded towards -inf
+        (float32_thresholds), so routing is unchanged at half the size.
+        """
+        threshold = float32_thresholds(self.threshold)
+        index_dtype = np.int32 if len(self.feature) < 2**31 else np.int64
+        meta = {
+            "format_version": COMPACT_FORMAT_VERSION,
+            "model_type": self.model_type,
+            "params": self.params,
+            "max_depth": self.max_depth,
+            "n_features": self.n_features_in_,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                feature=self.feature.astype(index_dtype),
+                threshold=threshold,
+                children_left=self.children_left.astype(index_dtype),
+                children_right=self.children_right.astype(index_dtype),
+                missing_go_to_left=self.missing_go_to_left,
+                proba=self.proba,
+                classes=self.classes_,
+                meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a tree written by save(). Only NumPy is needed.
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            meta = json.loads(arrays["meta"].tobytes())
+            if meta.get("format_version") != COMPACT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported compact model format: {meta.get('format_version')}")
+            return cls(
+                arrays["feature"].astype(np.intp),
+                arrays["threshold"],
+                arrays["children_left"].astype(np.intp),
+                arrays["children_right"].astype(np.intp),
+                arrays["missing_go_to_left"],
+                arrays["proba"],
+                arrays["classes"],
+                meta["max_depth"],
+                meta["n_features"],
+                params=meta["params"],
+                model_type=meta["model_type"],
+            )
+
+    def _validate(self, X):
+        # sklearn evaluates splits on float32 inputs; match it for identical routing
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a 2D array with {self.n_features_in_} features, got shape {X.shape}.")
+        has_nan = False
+        if not np.isfinite(X).all():
+            if np.isinf(X).any():
+                raise ValueError("Input X contains infinity.")
+            has_nan = True
+        return np.ascontiguousarray(X), has_nan
+
+    def apply(self, X):
+        """
+        Return the leaf index reached by each row.
+        """
+        X, has_nan = self._validate(X)
+        if self._leaf_table is not None:
+            return self._apply_lookup(X, has_nan)
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offset = np.arange(0, n_rows * n_features, n_features, dtype=np.intp)
+
+        node = np.zeros(n_rows, dtype=np.intp)
+        for _ in range(self.max_depth):
+            x = np.take(flat, row_offset + np.take(self.feature, node))
+            go_right = x > np.take(self._threshold32, node)
+            if has_nan:
+                go_right |= np.isnan(x) & ~np.take(self.missing_go_to_left, node)
+            node = np.take(self._children, 2 * node + go_right)
+        return node
+
+    def _apply_lookup(self, X, has_nan):
+        code = np.zeros(len(X), dtype=np.uint8 if len(self._splits) <= 8 else np.uint16)
+        for bit, node in enumerate(self._splits):
+            x = X[:, self.feature[node]]
+            go_right = x > self._threshold32[node]
+            if has_nan:
+                go_right |= np.isnan(x) & ~self.missing_go_to_left[node]
+            code |= go_right.astype(code.dtype) << code.dtype.type(bit)
+        return np.take(self._leaf_table, code)
+
+    def predict_proba(self, X):
+        return np.take(self.proba, self.apply(X), axis=0)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def load_artifact(path):
+    """
+    Load a model artifact and build the model used on the hot path.
+    .npz files are compact exports served by CompiledTree; anything else is
+    a joblib pickle.
+    Returns:
+        (model, inference_model)
+    """
+    if Path(path).suffix == ".npz":
+        model = CompiledTree.load(path)
+        return model, model
+    # Imported lazily: workers serving the compact format never load joblib/sklearn
+    import joblib
+
+    model = joblib.load(path, mmap_mode="r" if MODEL_MMAP else None)
+    if INFERENCE_MODE == "compiled":
+        return model, CompiledTree.from_sklearn(model)
+    return model, model
+
+def warm_up(inference_model):
+    # First calls pay for lazy imports and allocations; do it before going live
+    X = np.zeros((1, inference_model.n_features_in_))
+    for _ in range(3):
+        inference_model.predict_proba(X)
+
+registry = ModelRegistry(MODEL_PATH, load_artifact, warm_up)
+
+def training_metadata(version):
+    """
+    Training metadata written by train.py (params, CV scores, training time,
+    latency per row) if it describes the given model version, else None.
+    """
+    try:
+        with open(PICKLE_PATH.with_suffix(".json")) as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if version not in (metadata.get("version"), metadata.get("compact_version")):
+        return None
+    metadata.pop("trials", None)
+    return metadata
 
-@lru_cache(maxsize=1)
 def get_model():
-    # Loads once, then cached forever
-    return joblib.load(MODEL_PATH)
+    # Loaded on first use, replaced atomically on reload
+    return registry.current().model
+
+def get_inference_model():
+    """
+    Model used on the hot path, according to IRIS_INFERENCE_MODE.
+    """
+    return registry.current().inference_model
 
 def predict_data(X):
-    model = get_model()
+    model = get_inference_model()
     return model.predict(X)
 
 def predict_proba(X):
-    model = get_model()
-    return model.predict_proba(X)
\ No newline at end of file
+    model = get_inference_model()
+    return model.predict_proba(X)
+
+def predict_batch(X, return_version=False):
+    """
+    Score a whole matrix with a single predict_proba pass.
+    The class ids are taken from the argmax of the probabilities, which is
+    exactly what DecisionTreeClassifier.predict does internally.
+    Args:
+        X (array-like): Feature matrix of shape (n_rows, 4).
+        return_version (bool): Also return the version of the model that
+            scored X, read from the same registry snapshot.
+    Returns:
+        class_ids (numpy.ndarray), probabilities (numpy.ndarray)
+        [, version (str)]
+    """
+    entry = registry.current()
+    model = entry.inference_model
+    probs = model.predict_proba(np.asarray(X, dtype=np.float64))
+    class_ids = model.classes_.take(np.argmax(probs, axis=1), axis=0)
+    if return_version:
+        return class_ids, probs, entry.version
+    return class_ids, probs
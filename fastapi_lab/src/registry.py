@@ -0,0 +1,182 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+def file_version(path):
+    """
+    Content hash of a model artifact, used as its version id.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+class ModelVersion:
+    """
+    One loaded, warmed-up model artifact.
+    """
+
+    def __init__(self, version, path, model, inference_model, load_ms, warmup_ms):
+        self.version = version
+        self.path = str(path)
+        self.model = model
+        self.inference_model = inference_model
+        self.load_ms = load_ms
+        self.warmup_ms = warmup_ms
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "path": self.path,
+            "loaded_at": self.loaded_at.isoformat(),
+            "load_ms": round(self.load_ms, 3),
+            "warmup_ms": round(self.warmup_ms, 3),
+        }
+
+
+class ModelRegistry:
+    """
+    Holds the recently loaded model versions and the active one.
+
+    New artifacts are loaded and warmed up off to the side, then made active
+    with a single reference assignment. Callers take `current()` once per
+    request, so requests already in flight finish on the version they started
+    with while new requests see the new one.
+    """
+
+    def __init__(self, model_path, load_fn, warmup_fn=None, keep=3):
+        """
+        Args:
+            model_path (Path): Artifact watched and reloaded by default.
+            load_fn (callable): path -> (model, inference_model).
+            warmup_fn (callable): Optional inference_model -> None, run before activation.
+            keep (int): How many loaded versions to retain for rollback.
+        """
+        self.model_path = model_path
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.keep = keep
+        self._versions = OrderedDict()
+        self._active = None
+        # Serialises loads; readers never take it
+        self._lock = threading.Lock()
+
+    def current(self):
+        """
+        Active model version, loading the artifact on first use.
+        """
+        active = self._active
+        if active is None:
+            self.reload()
+            active = self._active
+        return active
+
+    def load(self, path=None):
+        """
+        Load and warm up an artifact without activating it.
+        """
+        path = path or self.model_path
+        version = file_version(path)
+        if version in self._versions:
+            return self._versions[version]
+
+        start = time.perf_counter()
+        model, inference_model = self.load_fn(path)
+        load_ms = (time.perf_counter() - start) * 1000.0
+
+        start = time.perf_counter()
+        if self.warmup_fn is not None:
+            self.warmup_fn(inference_model)
+        warmup_ms = (time.perf_counter() - start) * 1000.0
+
+        entry = ModelVersion(version, path, model, inference_model, load_ms, warmup_ms)
+        self._versions[version] = entry
+        return entry
+
+    def _prune(self):
+        # Drop the oldest versions beyond `keep`, never the active one
+        for version in list(self._versions):
+            if len(self._versions) <= self.keep:
+                break
+            if version != self._active.version:
+                self._versions.pop(version)
+
+    def reload(self, path=None):
+        """
+        Load the artifact at `path` (default: model_path) and swap it in.
+        Returns:
+            bool: True if the active version changed.
+        """
+        with self._lock:
+            entry = self.load(path)
+            changed = self._active is None or entry.version != self._active.version
+            self._active = entry
+            self._prune()
+            return changed
+
+    def activate(self, version):
+        """
+        Switch back to a version that is still held in memory.
+        """
+        with self._lock:
+            if version not in self._versions:
+                raise KeyError(f"Model version {version} is not loaded.")
+            self._active = self._versions[version]
+            return self._active
+
+    def versions(self):
+        return list(self._versions)
+
+    def info(self):
+        active = self.current()
+        return {**active.info(), "available_versions": self.versions()}
+
+
+class ModelWatcher:
+    """
+    Background thread that reloads the registry when the artifact file changes.
+    """
+
+    def __init__(self, registry, interval=2.0):
+        self.registry = registry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_stat = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.registry.model_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def start(self):
+        self._last_stat = self._stat()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stat = self._stat()
+            if stat is None or stat == self._last_stat:
+                continue
+            self._last_stat = stat
+            try:
+                if self.registry.reload():
+                    print(f"Model reloaded: version {self.registry.current().version}")
+            except Exception as e:
+                # Keep serving the old version; retry on the next change
+                print(f"Model reload failed, keeping current version: {e}")
@@ -0,0 +1,143 @@
+"""
+Pre-fork multi-worker server for the Iris API.
+
+The parent process loads and warms up the model once, freezes the GC so
+inherited objects are not dirtied by collections, opens the listening
+socket, and then forks the workers. Workers share the model's pages
+copy-on-write instead of each unpickling their own copy, and each one runs
+its own warm-up before it starts accepting connections. Crashed workers are
+restarted, with a growing delay while they keep failing right after start;
+SIGINT/SIGTERM shut everything down.
+
+Usage (from fastapi_lab/src):
+    python serve.py --workers 4 --port 8000
+    IRIS_WORKERS=4 IRIS_MODEL_MMAP=1 python serve.py
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+import uvicorn
+
+from predict import registry, warm_up
+
+# Restart delay after a worker crash: doubles while workers keep dying within
+# STABLE_SECS of starting, up to RESTART_MAX_DELAY; reset once one stays up
+RESTART_MIN_DELAY = 0.1
+RESTART_MAX_DELAY = float(os.environ.get("IRIS_RESTART_MAX_DELAY", 30.0))
+STABLE_SECS = 10.0
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock, log_level):
+    # Imported here so the app (and its env-driven config) is built after fork
+    import main
+
+    # Touch the inherited model once more in this process before serving
+    warm_up(registry.current().inference_model)
+    config = uvicorn.Config(main.app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(sock, log_level):
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        code = 1
+        try:
+            run_worker(sock, log_level)
+            code = 0
+        except SystemExit as e:
+            # uvicorn exits with a status of its own when startup fails
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+    return pid
+
+
+def serve(host, port, workers, log_level="info"):
+    """
+    Preload the model, fork `workers` processes on one shared socket and supervise them.
+    """
+    active = registry.current()
+    print(f"Loaded model version {active.version} "
+          f"(load {active.load_ms:.1f} ms, warm-up {active.warmup_ms:.1f} ms)")
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        import main
+        uvicorn.run(main.app, host=host, port=port, log_level=log_level)
+        return
+
+    sock = bind_socket(host, port)
+    # Objects that exist now are never collected again, so the GC won't write to their pages
+    gc.freeze()
+
+    children = {}
+    stopping = False
+    delay = RESTART_MIN_DELAY
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for _ in range(workers):
+        children[spawn(sock, log_level)] = time.monotonic()
+    print(f"Serving on http://{host}:{port} with {workers} workers: {sorted(children)}")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if stopping:
+            continue
+        if started is not None and time.monotonic() - started >= STABLE_SECS:
+            delay = RESTART_MIN_DELAY
+        print(f"Worker {pid} exited with code {os.waitstatus_to_exitcode(status)}; "
+              f"restarting in {delay:.1f} s")
+        time.sleep(delay)
+        delay = min(delay * 2, RESTART_MAX_DELAY)
+        if not stopping:
+            children[spawn(sock, log_level)] = time.monotonic()
+    sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-worker server for the Iris API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("IRIS_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.log_level)
+    sys.exit(0)
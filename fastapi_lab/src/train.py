@@ -1,6 +1,56 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 from sklearn.tree import DecisionTreeClassifier
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold, cross_val_score
 import joblib
 from data import load_data, split_data
+from registry import file_version
+from predict import CompiledTree
+
+MODEL_DIR = Path(__file__).resolve().parent.parent / "model"
+MODEL_PATH = MODEL_DIR / "iris_model.pkl"
+# Compact non-pickle export served with IRIS_MODEL_FORMAT=npz
+COMPACT_PATH = MODEL_PATH.with_suffix(".npz")
+# Training metadata written next to the model (same name, .json)
+METADATA_PATH = MODEL_PATH.with_suffix(".json")
+# Split arrays shared with the search workers
+DATASET_CACHE = MODEL_DIR / "iris_split.npz"
+
+PARAM_GRID = {
+    "max_depth": [2, 3, 4, 5, None],
+    "min_samples_leaf": [1, 2, 4],
+    "criterion": ["gini", "entropy"],
+}
+RANDOM_STATE = 12
+
+def save_model(model, path):
+    """
+    Write the model atomically so a serving process watching `path`
+    never loads a half-written file.
+    Args:
+        model: Fitted estimator.
+        path (str): Destination file.
+    """
+    tmp_path = f"{path}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+
+def export_compact(model, path=COMPACT_PATH):
+    """
+    Write the compact, versioned .npz export of a fitted tree (flat arrays,
+    no pickle), which predict.py can serve without importing scikit-learn.
+    Args:
+        model: Fitted DecisionTreeClassifier.
+        path (str): Destination file.
+    """
+    CompiledTree.from_sklearn(model).save(path)
 
 def fit_model(X_train, y_train):
     """
@@ -9,11 +59,140 @@ def fit_model(X_train, y_train):
         X_train (numpy.ndarray): Training features.
         y_train (numpy.ndarray): Training target values.
     """
-    dt_classifier = DecisionTreeClassifier(max_depth=3, random_state=12)
+    dt_classifier = DecisionTreeClassifier(max_depth=3, random_state=RANDOM_STATE)
     dt_classifier.fit(X_train, y_train)
-    joblib.dump(dt_classifier, "../model/iris_model.pkl")
+    save_model(dt_classifier, MODEL_PATH)
+    export_compact(dt_classifier)
 
-if __name__ == "__main__":
+def cache_dataset(path=DATASET_CACHE):
+    """
+    Load and split the dataset once and store the arrays as .npz.
+    Returns:
+        X_train, X_test, y_train, y_test (tuple): The split dataset.
+    """
     X, y = load_data()
-    X_train, X_test, y_train, y_test = split_data(X, y)
-    fit_model(X_train, y_train)
+    split = split_data(X, y)
+    np.savez(path, **dict(zip(["X_train", "X_test", "y_train", "y_test"], split)))
+    return split
+
+# Per-worker copy of the training arrays, loaded once by _init_worker
+_worker_data = {}
+
+def _init_worker(path):
+    with np.load(path) as arrays:
+        _worker_data["X_train"] = arrays["X_train"]
+        _worker_data["y_train"] = arrays["y_train"]
+
+def latency_per_row(model, X, repeats=200):
+    """
+    Measure inference latency in microseconds per row.
+    Returns:
+        dict: "single" (one row per predict call, best of `repeats`) and
+        "batch" (1000-row predict calls, divided by the row count).
+    """
+    row = X[:1]
+    single = min(_timed(model.predict, row) for _ in range(repeats))
+    batch_X = np.resize(X, (1000, X.shape[1]))
+    batch = min(_timed(model.predict, batch_X) for _ in range(max(repeats // 20, 3)))
+    return {"single": single * 1e6, "batch": batch * 1e6 / len(batch_X)}
+
+def _timed(fn, X):
+    start = time.perf_counter()
+    fn(X)
+    return time.perf_counter() - start
+
+def _run_trial(params, cv):
+    """
+    Cross-validate one parameter set on the worker's cached training arrays,
+    then refit on all of them to time training and inference.
+    """
+    X_train, y_train = _worker_data["X_train"], _worker_data["y_train"]
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=RANDOM_STATE)
+    scores = cross_val_score(DecisionTreeClassifier(random_state=RANDOM_STATE, **params),
+                             X_train, y_train, cv=folds)
+    start = time.perf_counter()
+    model = DecisionTreeClassifier(random_state=RANDOM_STATE, **params).fit(X_train, y_train)
+    train_time = time.perf_counter() - start
+    return {
+        "params": params,
+        "cv_scores": scores.tolist(),
+        "cv_mean": float(scores.mean()),
+        "cv_std": float(scores.std()),
+        "train_time_s": train_time,
+        "latency_us_per_row": latency_per_row(model, X_train),
+        "tree_depth": int(model.get_depth()),
+        "n_leaves": int(model.get_n_leaves()),
+    }
+
+def search_hyperparameters(param_grid=PARAM_GRID, n_iter=None, cv=5, workers=None):
+    """
+    Cross-validated grid search (or random search when n_iter is set) over
+    DecisionTreeClassifier hyperparameters, one trial per task in a process pool.
+    The split is computed once and cached as .npz; every worker loads it once.
+    The best trial (highest mean CV accuracy, then fewest leaves, then lowest
+    single-row latency) is refit, saved to MODEL_PATH and COMPACT_PATH (compact
+    export), and described in METADATA_PATH.
+    Args:
+        param_grid (dict): Parameter name -> list of values.
+        n_iter (int): Number of random candidates; None searches the full grid.
+        cv (int): Number of stratified folds.
+        workers (int): Worker processes (default: CPU count).
+    Returns:
+        dict: The metadata written to METADATA_PATH.
+    """
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    X_train, X_test, y_train, y_test = cache_dataset()
+    if n_iter is None:
+        candidates = list(ParameterGrid(param_grid))
+    else:
+        candidates = list(ParameterSampler(param_grid, n_iter=n_iter, random_state=RANDOM_STATE))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(DATASET_CACHE),)) as pool:
+        trials = list(pool.map(_run_trial, candidates, [cv] * len(candidates)))
+    search_time = time.perf_counter() - start
+
+    # Ties on accuracy go to the smaller tree (fewer leaves = shorter paths), then the faster one
+    best = max(trials, key=lambda t: (round(t["cv_mean"], 10), -t["n_leaves"], -t["latency_us_per_row"]["single"]))
+    model = DecisionTreeClassifier(random_state=RANDOM_STATE, **best["params"]).fit(X_train, y_train)
+    save_model(model, MODEL_PATH)
+    export_compact(model)
+
+    metadata = {
+        "model_path": MODEL_PATH.name,
+        "version": file_version(MODEL_PATH),
+        "compact_version": file_version(COMPACT_PATH),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "model_type": type(model).__name__,
+        **best,
+        "test_accuracy": float(model.score(X_test, y_test)),
+        "search": {"strategy": "grid" if n_iter is None else "random", "n_candidates": len(candidates),
+                   "cv": cv, "seconds": search_time},
+        "trials": trials,
+    }
+    tmp_path = f"{METADATA_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, METADATA_PATH)
+    return metadata
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the Iris decision tree.")
+    parser.add_argument("--no-search", action="store_true", help="Fit the fixed max_depth=3 tree only")
+    parser.add_argument("--n-iter", type=int, help="Random search with this many candidates (default: full grid)")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.no_search:
+        X, y = load_data()
+        X_train, X_test, y_train, y_test = split_data(X, y)
+        fit_model(X_train, y_train)
+    else:
+        meta = search_hyperparameters(n_iter=args.n_iter, cv=args.cv, workers=args.workers)
+        print(f"Best params: {meta['params']}  CV accuracy {meta['cv_mean']:.4f} ± {meta['cv_std']:.4f}  "
+              f"test accuracy {meta['test_accuracy']:.4f}  "
+              f"latency {meta['latency_us_per_row']['single']:.1f} µs/row (single), "
+              f"{meta['latency_us_per_row']['batch']:.3f} µs/row (batch)  "
+              f"[{meta['search']['n_candidates']} candidates in {meta['search']['seconds']:.1f} s]")
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import MicroBatcher
+
+
+def _echo(X):
+    return X[:, 0].astype(int), X / X.sum(axis=1, keepdims=True)
+
+
+def test_submit_returns_own_row():
+    """Every caller gets the prediction for its own row back"""
+    async def run():
+        batcher = MicroBatcher(_echo, max_wait_ms=5.0, max_batch_size=8)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit([i, 1, 1, 1]) for i in range(1, 6)))
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert [int(class_id) for class_id, _ in results] == [1, 2, 3, 4, 5]
+
+
+def test_batch_level_values_reach_every_caller():
+    """Extra values returned by predict_fn (e.g. the model version) are appended to each result"""
+    def versioned(X):
+        return (*_echo(X), "v1")
+
+    async def run():
+        batcher = MicroBatcher(versioned, max_wait_ms=5.0, max_batch_size=8)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit([i, 1, 1, 1]) for i in range(1, 4)))
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert [(int(class_id), version) for class_id, _, version in results] == [(1, "v1"), (2, "v1"), (3, "v1")]
+
+
+def test_stop_mid_batch_fails_pending_requests():
+    """Stopping while a batch is being scored fails its callers instead of leaving them hanging"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_predict(X):
+        started.set()
+        release.wait(5)
+        return _echo(X)
+
+    async def run():
+        batcher = MicroBatcher(blocking_predict, max_wait_ms=0.0, max_batch_size=4)
+        await batcher.start()
+        pending = [asyncio.ensure_future(batcher.submit([1, 1, 1, 1])) for _ in range(3)]
+        await asyncio.to_thread(started.wait, 5)
+        await batcher.stop()
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), 1)
+
+    results = asyncio.run(run())
+    assert len(results) == 3
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_stop_while_waiting_for_batch_fails_pending_requests():
+    """Stopping during the max-wait window fails the row already taken off the queue"""
+    async def run():
+        batcher = MicroBatcher(_echo, max_wait_ms=10_000.0, max_batch_size=4)
+        await batcher.start()
+        pending = asyncio.ensure_future(batcher.submit([1, 1, 1, 1]))
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(pending, return_exceptions=True), 1)
+
+    result, = asyncio.run(run())
+    assert isinstance(result, RuntimeError)
@@ -0,0 +1,59 @@
+"""
+Benchmark calculator.fun8 (pure Python) against vectorized.fun8 (NumPy)
+on vectors of 10 to 10 million elements.
+
+Usage (from github_labs_lab1/):
+    python benchmarks/bench_vectorized.py
+    python benchmarks/bench_vectorized.py --max-exp 6 --combine multiply --aggregate sum
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import calculator, vectorized
+
+
+def best_time(fn, *args, budget=1.0, max_repeats=50):
+    """
+    Best-of-N wall time, repeating until `budget` seconds are spent.
+    """
+    best, spent, repeats = float('inf'), 0.0, 0
+    while repeats < max_repeats and (repeats < 3 or spent < budget):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best, spent, repeats = min(best, elapsed), spent + elapsed, repeats + 1
+        if elapsed > budget:
+            break
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-exp', type=int, default=7, help='Largest size is 10**max_exp')
+    parser.add_argument('--combine', default='add', choices=['add', 'subtract', 'multiply'])
+    parser.add_argument('--aggregate', default='mean', choices=['mean', 'max', 'sum'])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"fun8(..., '{args.combine}', '{args.aggregate}')")
+    print(f"{'n':>10}  {'python list':>12}  {'numpy (list)':>12}  {'numpy (array)':>13}  {'speedup':>8}")
+    for exp in range(1, args.max_exp + 1):
+        n = 10 ** exp
+        a, b = rng.random(n), rng.random(n)
+        list_a, list_b = a.tolist(), b.tolist()
+        ops = (args.combine, args.aggregate)
+        t_py = best_time(calculator.fun8, list_a, list_b, *ops)
+        t_list = best_time(vectorized.fun8, list_a, list_b, *ops)
+        t_array = best_time(vectorized.fun8, a, b, *ops)
+        print(f"{n:>10,}  {t_py * 1e3:10.3f}ms  {t_list * 1e3:10.3f}ms  {t_array * 1e3:11.3f}ms  "
+              f"{t_py / t_array:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
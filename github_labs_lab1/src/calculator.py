@@ -1,3 +1,7 @@
+from itertools import chain, zip_longest
+from math import isfinite
+
+
 def fun1(x, y):
     """
     Adds two numbers together.
@@ -173,6 +177,175 @@ def fun8(list1, list2, combine_op='add', aggregate_op='mean'):
         raise ValueError("Invalid aggregate operation. Choose 'mean', 'max', or 'sum'.")
 
 
+class StreamingAggregator:
+    """
+    Running count, sum, mean, max and min over a stream of numbers in O(1) memory.
+
+    Integers are summed exactly; floats use Neumaier compensated summation, so
+    the sum does not drift over long streams. Partial aggregators (e.g. one per
+    worker) can be combined with merge().
+
+    Example:
+        >>> agg = StreamingAggregator()
+        >>> agg.update(x * 0.1 for x in range(10))
+        >>> agg.add(5)
+        >>> agg.count, agg.max
+        (11, 5)
+    """
+
+    def __init__(self, values=None):
+        self.count = 0
+        self._int_total = 0
+        self._float_total = 0.0
+        self._compensation = 0.0
+        self._has_float = False
+        self._max = None
+        self._min = None
+        if values is not None:
+            self.update(values)
+
+    def add(self, value):
+        """
+        Adds one number.
+        Raises:
+            ValueError: If value is not a number.
+        """
+        if not isinstance(value, (int, float)):
+            raise ValueError("All elements must be numbers.")
+        if isinstance(value, float):
+            self._add_float(value)
+        else:
+            self._int_total += value
+        if self.count == 0:
+            self._max = self._min = value
+        else:
+            # same comparisons as max()/min(), so NaN handling matches them
+            if value > self._max:
+                self._max = value
+            if value < self._min:
+                self._min = value
+        self.count += 1
+
+    def update(self, values):
+        """
+        Adds every number of an iterable (list, generator, chunk of a larger stream).
+        """
+        for value in values:
+            self.add(value)
+
+    def _add_float(self, value):
+        self._has_float = True
+        total = self._float_total + value
+        # Once the sum is inf/nan (or overflows) the correction term would be
+        # inf - inf = nan; skip it and let the total carry the result, like sum()
+        if isfinite(total):
+            if abs(self._float_total) >= abs(value):
+                self._compensation += (self._float_total - total) + value
+            else:
+                self._compensation += (value - total) + self._float_total
+        self._float_total = total
+
+    def merge(self, other):
+        """
+        Folds another aggregator (e.g. from a parallel worker) into this one.
+        Returns:
+            StreamingAggregator: self, for chaining.
+        """
+        if other.count == 0:
+            return self
+        self._int_total += other._int_total
+        if other._has_float:
+            self._add_float(other._float_total)
+            self._compensation += other._compensation
+        if self.count == 0:
+            self._max, self._min = other._max, other._min
+        else:
+            if other._max > self._max:
+                self._max = other._max
+            if other._min < self._min:
+                self._min = other._min
+        self.count += other.count
+        return self
+
+    def _require_values(self):
+        if self.count == 0:
+            raise ValueError("List cannot be empty.")
+
+    @property
+    def sum(self):
+        """int/float: Sum of the values (0 when empty)."""
+        if not self._has_float:
+            return self._int_total
+        return self._int_total + (self._float_total + self._compensation)
+
+    @property
+    def mean(self):
+        """float: Mean of the values. Raises ValueError when empty."""
+        self._require_values()
+        return self.sum / self.count
+
+    @property
+    def max(self):
+        """int/float: Largest value. Raises ValueError when empty."""
+        self._require_values()
+        return self._max
+
+    @property
+    def min(self):
+        """int/float: Smallest value. Raises ValueError when empty."""
+        self._require_values()
+        return self._min
+
+
+def fun8_stream(iterable1, iterable2, combine_op='add', aggregate_op='mean'):
+    """
+    Streaming variant of fun8: combines two iterables element-wise as they are
+    consumed, without building intermediate lists.
+
+    Args:
+        iterable1 (iterable): First sequence of numbers (list, generator, ...).
+        iterable2 (iterable): Second sequence of numbers.
+        combine_op (str): Operation to combine lists ('add', 'subtract', 'multiply').
+        aggregate_op (str): Aggregate operation ('mean', 'max', 'sum').
+
+    Returns:
+        float: Aggregated result after combining lists.
+
+    Raises:
+        ValueError: If the iterables are empty, have different lengths, contain
+                   non-numeric values, or invalid operations are specified.
+    """
+    # Errors are raised in fun8's order: empty input, different lengths,
+    # non-numbers in iterable1, then in iterable2, then invalid operations.
+    # Later checks only run once the iterables are fully consumed.
+    missing = object()
+    iterator1, iterator2 = iter(iterable1), iter(iterable2)
+    first1, first2 = next(iterator1, missing), next(iterator2, missing)
+    if first1 is missing or first2 is missing:
+        raise ValueError("Lists cannot be empty.")
+
+    combine = {'add': fun1, 'subtract': fun2, 'multiply': fun3}.get(combine_op)
+    aggregator = StreamingAggregator()
+    invalid1 = invalid2 = False
+    for a, b in zip_longest(chain([first1], iterator1), chain([first2], iterator2), fillvalue=missing):
+        if a is missing or b is missing:
+            raise ValueError("Lists must have the same length.")
+        invalid1 = invalid1 or not isinstance(a, (int, float))
+        invalid2 = invalid2 or not isinstance(b, (int, float))
+        if combine is not None and not (invalid1 or invalid2):
+            aggregator.add(combine(a, b))
+
+    if invalid1:
+        raise ValueError("All elements in list1 must be numbers.")
+    if invalid2:
+        raise ValueError("All elements in list2 must be numbers.")
+    if combine is None:
+        raise ValueError("Invalid combine operation. Choose 'add', 'subtract', or 'multiply'.")
+    if aggregate_op not in ('mean', 'max', 'sum'):
+        raise ValueError("Invalid aggregate operation. Choose 'mean', 'max', or 'sum'.")
+    return getattr(aggregator, aggregate_op)
+
+
 # Test the functions (optional - can comment out later)
 if __name__ == "__main__":
     # Test basic operations
@@ -192,3 +365,4 @@ if __name__ == "__main__":
     list2 = [4, 5, 6]
     print("Testing fun8 (add then mean):", fun8(list1, list2, 'add', 'mean'))
     print("Testing fun8 (multiply then max):", fun8(list1, list2, 'multiply', 'max'))
+    print("Testing fun8_stream (add then mean):", fun8_stream(iter(list1), iter(list2), 'add', 'mean'))
@@ -0,0 +1,179 @@
+"""
+Vectorized NumPy versions of the calculator's list operations.
+
+fun6, fun7 and fun8 here are drop-in replacements for the ones in
+calculator.py: they raise the same exceptions with the same messages and
+return plain Python int/float results, but accept lists, array.array or
+NumPy arrays and do the validation, combine and aggregate steps as single
+array operations.
+
+Integer results are exact (inputs that could overflow int64 fall back to
+calculator.py). Float sums use NumPy's pairwise summation, so they can
+differ from Python's sum() in the last digits, and a list mixing ints and
+floats is computed in float64 (fun7 may return 3.0 where max() returns 3).
+"""
+import numpy as np
+
+from src import calculator
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+_COMBINE = {'add': np.add, 'subtract': np.subtract, 'multiply': np.multiply}
+
+
+def as_numeric_array(values, message="All elements must be numbers."):
+    """
+    Converts a list, array.array or NumPy array to a 1-D numeric array,
+    validating the dtype once instead of each element.
+    Args:
+        values (list/array.array/numpy.ndarray): Input values.
+        message (str): ValueError message for non-numeric input.
+    Returns:
+        numpy.ndarray: bool, int64 or float64 array, or None if the values
+        are valid Python numbers that do not fit a fixed-width dtype (e.g.
+        ints beyond 64 bits).
+    Raises:
+        ValueError: If any element is not a number.
+    """
+    try:
+        array = np.asarray(values)
+    except (ValueError, TypeError):
+        # ragged nested sequences
+        raise ValueError(message)
+    if array.ndim != 1:
+        raise ValueError(message)
+    if array.dtype.kind == 'O':
+        # big Python ints (or invalid objects): validate like the original
+        if not all(isinstance(num, (int, float)) for num in values):
+            raise ValueError(message)
+        return None
+    if array.dtype.kind not in 'biuf':
+        raise ValueError(message)
+    if array.dtype.kind == 'f':
+        return array.astype(np.float64, copy=False)
+    if array.dtype.kind == 'b':
+        return array
+    if array.dtype.kind == 'u' and array.size and array.max() > _INT64_MAX:
+        return None
+    return array.astype(np.int64, copy=False)
+
+
+def _python_list(values):
+    # Fallback input for calculator.py: Python numbers, never NumPy scalars
+    # (np.uint64 beyond int64 is not an int to its isinstance checks)
+    return np.asarray(values).tolist()
+
+
+def _max_abs(array):
+    # Largest magnitude as a Python number (no int64 overflow on abs(min))
+    return max(abs(array.max().item()), abs(array.min().item()))
+
+
+def _fits_int64(bound):
+    return bound <= _INT64_MAX
+
+
+def fun6(numbers_list):
+    """
+    Calculates the mean (average) of a sequence of numbers.
+    Args:
+        numbers_list (list/array.array/numpy.ndarray): Numbers.
+    Returns:
+        float: Mean of the numbers.
+    Raises:
+        ValueError: If the sequence is empty or contains non-numeric values.
+    """
+    if len(numbers_list) == 0:
+        raise ValueError("List cannot be empty.")
+    array = as_numeric_array(numbers_list)
+    if array is None:
+        return calculator.fun6(_python_list(numbers_list))
+    if array.dtype.kind == 'i' and not _fits_int64(_max_abs(array) * len(array)):
+        return calculator.fun6(array.tolist())
+    # integer totals are exact, then true division like sum(...) / len(...)
+    return array.sum().item() / len(array)
+
+
+def fun7(numbers_list):
+    """
+    Finds the maximum value in a sequence of numbers.
+    Args:
+        numbers_list (list/array.array/numpy.ndarray): Numbers.
+    Returns:
+        int/float: Maximum value.
+    Raises:
+        ValueError: If the sequence is empty or contains non-numeric values.
+    """
+    if len(numbers_list) == 0:
+        raise ValueError("List cannot be empty.")
+    array = as_numeric_array(numbers_list)
+    if array is None:
+        return calculator.fun7(_python_list(numbers_list))
+    return _max(array)
+
+
+def _max(array):
+    if array.dtype.kind == 'f' and np.isnan(array).any():
+        # Python's max() result with NaNs depends on their position
+        return max(array.tolist())
+    return array.max().item()
+
+
+def fun8(list1, list2, combine_op='add', aggregate_op='mean'):
+    """
+    Combines two sequences element-wise, then calculates an aggregate statistic.
+
+    Args:
+        list1 (list/array.array/numpy.ndarray): First sequence of numbers.
+        list2 (list/array.array/numpy.ndarray): Second sequence of numbers.
+        combine_op (str): Operation to combine lists ('add', 'subtract', 'multiply').
+        aggregate_op (str): Aggregate operation ('mean', 'max', 'sum').
+
+    Returns:
+        float: Aggregated result after combining lists.
+
+    Raises:
+        ValueError: If lists are empty, have different lengths, contain non-numeric values,
+                   or invalid operations are specified.
+
+    Example:
+        >>> fun8([1, 2, 3], [4, 5, 6], 'add', 'mean')
+        7.0
+        >>> fun8(np.array([2, 3, 4]), [1, 2, 3], 'multiply', 'sum')
+        20
+    """
+    if len(list1) == 0 or len(list2) == 0:
+        raise ValueError("Lists cannot be empty.")
+    if len(list1) != len(list2):
+        raise ValueError("Lists must have the same length.")
+    a = as_numeric_array(list1, "All elements in list1 must be numbers.")
+    b = as_numeric_array(list2, "All elements in list2 must be numbers.")
+
+    if combine_op not in _COMBINE:
+        raise ValueError("Invalid combine operation. Choose 'add', 'subtract', or 'multiply'.")
+    if aggregate_op not in ('mean', 'max', 'sum'):
+        raise ValueError("Invalid aggregate operation. Choose 'mean', 'max', or 'sum'.")
+
+    if a is None or b is None or _int_overflow(a, b, combine_op, aggregate_op):
+        return calculator.fun8(_python_list(list1) if a is None else a.tolist(),
+                               _python_list(list2) if b is None else b.tolist(),
+                               combine_op, aggregate_op)
+
+    # bools combine like Python ints (True + True == 2), not as logical ops
+    combined = _COMBINE[combine_op](a.astype(np.int64, copy=False) if a.dtype.kind == 'b' else a,
+                                    b.astype(np.int64, copy=False) if b.dtype.kind == 'b' else b)
+    if aggregate_op == 'max':
+        return _max(combined)
+    total = combined.sum().item()
+    return total / len(combined) if aggregate_op == 'mean' else total
+
+
+def _int_overflow(a, b, combine_op, aggregate_op):
+    # Python ints never overflow; fall back when an int64 result could
+    if a.dtype.kind not in 'bi' or b.dtype.kind not in 'bi':
+        return False
+    bound_a, bound_b = _max_abs(a), _max_abs(b)
+    bound = bound_a * bound_b if combine_op == 'multiply' else bound_a + bound_b
+    if aggregate_op != 'max':
+        bound *= len(a)
+    return not _fits_int64(bound)
@@ -1,9 +1,13 @@
+import array
+import math
 import pytest
+import re
 import sys
 import os
+import numpy as np
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src import calculator
+from src import calculator, vectorized
 
 
 def test_fun1():
@@ -103,3 +107,139 @@ def test_fun8():
     # Test invalid aggregate operation
     with pytest.raises(ValueError):
         calculator.fun8([1, 2], [3, 4], 'add', 'median')
+
+
+def test_streaming_aggregator():
+    """Test running statistics and merging of partial aggregators"""
+    agg = calculator.StreamingAggregator([1, 2, 3])
+    agg.update(x for x in [4, 5])
+    assert agg.count == 5
+    assert agg.sum == 15
+    assert agg.mean == 3.0
+    assert agg.max == 5
+    assert agg.min == 1
+
+    # Compensated summation does not lose the small values
+    values = [0.1] * 1000 + [1e16, 1.0, -1e16]
+    assert calculator.StreamingAggregator(values).sum == pytest.approx(101.0, abs=1e-9)
+
+    left = calculator.StreamingAggregator([1.5, -2])
+    right = calculator.StreamingAggregator([10, 0.25])
+    merged = left.merge(right)
+    assert merged.count == 4
+    assert merged.sum == pytest.approx(9.75)
+    assert merged.max == 10
+    assert merged.min == -2
+
+    # Infinities and overflow propagate like sum() instead of turning into nan
+    inf = float('inf')
+    assert calculator.StreamingAggregator([inf]).sum == calculator.fun6([inf]) == inf
+    assert calculator.StreamingAggregator([1.0, inf, 2]).mean == inf
+    assert calculator.StreamingAggregator([-inf, 0.5]).min == -inf
+    assert calculator.StreamingAggregator([1e308, 1e308]).sum == inf
+    assert calculator.StreamingAggregator([1e308, 1e308, -1e308]).sum == sum([1e308, 1e308, -1e308])
+    assert math.isnan(calculator.StreamingAggregator([inf, -inf]).sum)
+    assert calculator.StreamingAggregator([0.1, 0.2]).merge(calculator.StreamingAggregator([inf])).sum == inf
+
+    # Test empty and invalid input errors
+    with pytest.raises(ValueError):
+        calculator.StreamingAggregator().mean
+    with pytest.raises(ValueError):
+        calculator.StreamingAggregator().add('a')
+
+
+def test_fun8_stream():
+    """Test streaming nested operations function"""
+    assert calculator.fun8_stream(iter([1, 2, 3]), iter([4, 5, 6]), 'add', 'mean') == 7.0
+    assert calculator.fun8_stream((x for x in [2, 3, 4]), [1, 2, 3], 'multiply', 'max') == 12
+    assert calculator.fun8_stream(range(10, 40, 10), [5, 10, 15], 'subtract', 'sum') == 30
+
+    # Test different length iterables error
+    with pytest.raises(ValueError, match="same length"):
+        calculator.fun8_stream(iter([1, 2]), iter([3, 4, 5]), 'add', 'mean')
+
+    # Test empty iterables error
+    with pytest.raises(ValueError, match="empty"):
+        calculator.fun8_stream(iter([]), iter([]), 'add', 'mean')
+
+    # Test invalid operations
+    with pytest.raises(ValueError):
+        calculator.fun8_stream([1, 2], [3, 4], 'divide', 'mean')
+    with pytest.raises(ValueError):
+        calculator.fun8_stream([1, 2], [3, 4], 'add', 'median')
+
+    # Overflowing inputs give the same result as fun8
+    for aggregate_op in ('mean', 'max', 'sum'):
+        assert calculator.fun8_stream([1e308, 1.0], [1e308, 2.0], 'add', aggregate_op) == \
+            calculator.fun8([1e308, 1.0], [1e308, 2.0], 'add', aggregate_op)
+
+
+@pytest.mark.parametrize("list1, list2, combine_op, aggregate_op", [
+    ([], [1], 'divide', 'median'),
+    ([1, 2], [3], 'divide', 'median'),
+    (['a', 2], [3, 4, 5], 'add', 'mean'),
+    ([1, 'a'], ['b', 4], 'divide', 'mean'),
+    ([1, 2], [3, 'b'], 'divide', 'mean'),
+    ([1, 2], [3, 4], 'divide', 'median'),
+    ([1, 2], [3, 4], 'add', 'median'),
+])
+def test_fun8_stream_error_order(list1, list2, combine_op, aggregate_op):
+    """Test that fun8_stream reports the same error as fun8 when several apply"""
+    with pytest.raises(ValueError) as expected:
+        calculator.fun8(list1, list2, combine_op, aggregate_op)
+    with pytest.raises(ValueError, match=re.escape(str(expected.value))):
+        calculator.fun8_stream(iter(list1), iter(list2), combine_op, aggregate_op)
+
+def test_vectorized_matches_calculator():
+    """Test vectorized list operations against the pure Python ones"""
+    cases = [([1, 2, 3], [4, 5, 6]), ([2, 3, 4], [1, 2, 3]), ([0.5, -1.5, 2.25], [4, 5, 6]),
+             ([True, False, True], [1, 2, 3])]
+    for list1, list2 in cases:
+        assert vectorized.fun6(list1) == calculator.fun6(list1)
+        assert vectorized.fun7(list1) == calculator.fun7(list1)
+        for combine_op in ['add', 'subtract', 'multiply']:
+            for aggregate_op in ['mean', 'max', 'sum']:
+                expected = calculator.fun8(list1, list2, combine_op, aggregate_op)
+                result = vectorized.fun8(list1, list2, combine_op, aggregate_op)
+                assert result == pytest.approx(expected)
+                assert type(result) is type(expected)
+
+
+def test_vectorized_array_inputs():
+    """Test vectorized operations on array.array and NumPy inputs"""
+    assert vectorized.fun6(np.array([1, 2, 3, 4, 5])) == 3.0
+    assert vectorized.fun7(array.array('d', [-5, -1, -10])) == -1
+    assert vectorized.fun8(np.array([2, 3, 4]), array.array('i', [1, 2, 3]), 'multiply', 'sum') == 20
+    assert type(vectorized.fun8(np.array([2, 3, 4]), [1, 2, 3], 'multiply', 'max')) is int
+
+
+def test_vectorized_big_integers():
+    """Test that integer results stay exact instead of overflowing int64"""
+    big = [2**62, 2**62]
+    assert vectorized.fun8(big, [1, 1], 'add', 'sum') == 2**63 + 2
+    assert vectorized.fun6([2**70, 2]) == calculator.fun6([2**70, 2])
+
+
+def test_vectorized_uint64_beyond_int64():
+    """Test uint64 arrays with values above the int64 range"""
+    huge = np.array([2**63, 1], dtype=np.uint64)
+    assert vectorized.fun6(huge) == calculator.fun6([2**63, 1])
+    assert vectorized.fun7(huge) == 2**63
+    assert vectorized.fun8(huge, [1, 1], 'add', 'sum') == 2**63 + 3
+    assert vectorized.fun8([1, 1], huge, 'multiply', 'max') == 2**63
+
+
+def test_vectorized_errors():
+    """Test that vectorized operations raise the same errors"""
+    with pytest.raises(ValueError, match="List cannot be empty."):
+        vectorized.fun6(np.array([]))
+    with pytest.raises(ValueError, match="All elements must be numbers."):
+        vectorized.fun7([1, 'a', 3])
+    with pytest.raises(ValueError, match="Lists must have the same length."):
+        vectorized.fun8([1, 2], [3, 4, 5], 'add', 'mean')
+    with pytest.raises(ValueError, match="All elements in list2 must be numbers."):
+        vectorized.fun8([1, 2], [3, None], 'add', 'mean')
+    with pytest.raises(ValueError, match="Invalid combine operation"):
+        vectorized.fun8([1, 2], [3, 4], 'divide', 'mean')
+    with pytest.raises(ValueError, match="Invalid aggregate operation"):
+        vectorized.fun8([1, 2], [3, 4], 'add', 'median')
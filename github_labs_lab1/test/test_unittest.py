@@ -1,12 +1,13 @@
 import sys
 import os
 import unittest
+import numpy as np
 
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(project_root)
 
-from src import calculator
+from src import calculator, vectorized
 
 
 class TestCalculator(unittest.TestCase):
@@ -60,5 +61,36 @@ class TestCalculator(unittest.TestCase):
         self.assertEqual(calculator.fun8([2, 3, 4], [1, 2, 3], 'multiply', 'sum'), 20)
 
 
+    def test_streaming_aggregator(self):
+        agg = calculator.StreamingAggregator(x for x in [1, 2, 3, 4, 5])
+        self.assertEqual(agg.mean, 3.0)
+        self.assertEqual(agg.max, 5)
+        self.assertEqual(agg.min, 1)
+        merged = calculator.StreamingAggregator([10, 20]).merge(calculator.StreamingAggregator([30]))
+        self.assertEqual(merged.sum, 60)
+        self.assertEqual(merged.count, 3)
+        self.assertEqual(calculator.StreamingAggregator([float('inf'), 1.0]).sum, float('inf'))
+        self.assertEqual(calculator.StreamingAggregator([1e308, 1e308]).mean, float('inf'))
+        with self.assertRaises(ValueError):
+            calculator.StreamingAggregator().max
+
+    def test_fun8_stream(self):
+        self.assertEqual(calculator.fun8_stream(iter([1, 2, 3]), iter([4, 5, 6]), 'add', 'mean'), 7.0)
+        self.assertEqual(calculator.fun8_stream([2, 3, 4], [1, 2, 3], 'multiply', 'sum'), 20)
+        with self.assertRaises(ValueError):
+            calculator.fun8_stream(iter([1, 2]), iter([3, 4, 5]), 'add', 'mean')
+        with self.assertRaisesRegex(ValueError, "empty"):
+            calculator.fun8_stream(iter([]), iter([1]), 'divide', 'mean')
+
+    def test_vectorized(self):
+        self.assertEqual(vectorized.fun6(np.array([1, 2, 3, 4, 5])), 3.0)
+        self.assertEqual(vectorized.fun7([-5, -1, -10]), -1)
+        self.assertEqual(vectorized.fun8([1, 2, 3], [4, 5, 6], 'add', 'mean'), 7.0)
+        self.assertEqual(vectorized.fun8(np.array([2, 3, 4]), [1, 2, 3], 'multiply', 'max'), 12)
+        self.assertEqual(vectorized.fun8([10, 20, 30], [5, 10, 15], 'subtract', 'sum'), 30)
+        with self.assertRaises(ValueError):
+            vectorized.fun8([1, 2], [3, 4, 5], 'add', 'mean')
+
+
 if __name__ == '__main__':
     unittest.main()